@@ -1,5 +1,6 @@
 """Django settings for yatube project."""
 
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -30,6 +31,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'django_perf.PerfMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,6 +39,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'django_perf.routers.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube_api.urls'
@@ -69,6 +72,23 @@ DATABASES = {
     }
 }
 
+# Read replicas for `list` and `retrieve` actions, see
+# django_perf/routers.py. Locally a copy of the database will do:
+# DATABASE_REPLICAS=replica.sqlite3
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+        filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['django_perf.routers.ReplicaRouter']
+# Seconds a client reads from the primary after a write.
+REPLICA_PIN_SECONDS = 5
+
 
 # Password validation
 
@@ -2,10 +2,13 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
+from django_perf import slow_queries_view, slowest_views
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('perf/slowest/', slowest_views, name='slowest_views'),
+    path('perf/slow-queries/', slow_queries_view, name='slow_queries'),
     path('api/v1/', include('api.urls')),
 ]
 
@@ -0,0 +1,170 @@
+from http import HTTPStatus
+from importlib import import_module
+from io import StringIO
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.pagination import FeedPagination
+from api.views import FeedViewSet
+from posts.models import Follow, Post, TimelineEntry
+from posts.timelines import invalidate_celebrities
+
+
+@pytest.mark.django_db
+class TestFeedAPI:
+
+    url = '/api/v1/feed/'
+
+    @pytest.fixture(autouse=True)
+    def fanout_limit(self, settings):
+        # Authors with more than one follower are merged on read.
+        settings.FEED_FANOUT_LIMIT = 1
+        invalidate_celebrities()
+        yield
+        invalidate_celebrities()
+
+    @staticmethod
+    def create_posts(author, count):
+        return [Post.objects.create(author=author, text=f'Пост {number}')
+                for number in range(count)]
+
+    def read_feed(self, client):
+        ids, url = [], self.url
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{self.url}` возвращает ответ '
+                'со статусом 200.'
+            )
+            data = response.json()
+            assert len(data['results']) <= 10
+            ids.extend(post['id'] for post in data['results'])
+            url = data['next']
+        return ids
+
+    @staticmethod
+    def newest_first(posts):
+        return [post.id for post in sorted(
+            posts, key=lambda post: (post.pub_date, post.id), reverse=True
+        )]
+
+    def test_feed_not_auth(self, client):
+        assert client.get(self.url).status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_feed(self, user_client, user, user_2, another_user,
+                  follow_1, follow_5):
+        # another_user is followed by one user: its posts are copied.
+        followed = self.create_posts(another_user, 15)
+        self.create_posts(user, 3)
+        Follow.objects.create(user=another_user, following=user_2)
+        # The cached set of celebrities expires.
+        invalidate_celebrities()
+        followed += self.create_posts(user_2, 15)
+        assert not TimelineEntry.objects.filter(
+            post__author=user_2
+        ).exists(), (
+            'Убедитесь, что посты авторов с числом подписчиков больше '
+            '`FEED_FANOUT_LIMIT` не копируются в ленты подписчиков.'
+        )
+        assert self.read_feed(user_client) == self.newest_first(followed), (
+            f'Проверьте, что `{self.url}` выводит посты авторов, на которых '
+            'подписан пользователь, от новых к старым и без повторов.'
+        )
+
+    def test_feed_follow(self, user_client, user, another_user, post):
+        posts = self.create_posts(another_user, 3)
+        assert not self.read_feed(user_client)
+        follow = Follow.objects.create(user=user, following=another_user)
+        assert self.read_feed(user_client) == self.newest_first(posts), (
+            'Убедитесь, что после подписки в ленте появляются прежние '
+            'посты автора.'
+        )
+        follow.delete()
+        assert not self.read_feed(user_client)
+
+    def test_feed_author_leaves_celebrities(
+        self, user_client, user, user_2, another_user,
+        django_capture_on_commit_callbacks
+    ):
+        Follow.objects.create(user=user, following=another_user)
+        follow = Follow.objects.create(user=user_2, following=another_user)
+        invalidate_celebrities()
+        posts = self.create_posts(another_user, 3)
+        assert not TimelineEntry.objects.exists()
+        with django_capture_on_commit_callbacks(execute=True):
+            follow.delete()
+        posts += self.create_posts(another_user, 1)
+        assert list(
+            TimelineEntry.objects.filter(user=user)
+            .order_by('-pub_date', '-post_id')
+            .values_list('post_id', flat=True)
+        ) == self.newest_first(posts), (
+            'Убедитесь, что когда у автора остаётся `FEED_FANOUT_LIMIT` '
+            'подписчиков, его посты копируются в ленты подписчиков.'
+        )
+        assert self.read_feed(user_client) == self.newest_first(posts)
+
+    def test_feed_queryset(self, user, another_user, follow_1, post):
+        posts = self.create_posts(another_user, 12)
+        request = Request(APIRequestFactory().get(self.url))
+        request.user = user
+        view = FeedViewSet(request=request, format_kwarg=None)
+        queryset = view.filter_queryset(view.get_queryset())
+        assert set(queryset.values_list('id', flat=True)) == {
+            post.id for post in posts
+        }, (
+            'Убедитесь, что `get_queryset()` ленты возвращает QuerySet '
+            'постов авторов, на которых подписан пользователь.'
+        )
+        page = FeedPagination().paginate_queryset(queryset, request)
+        assert [post.id for post in page] == self.newest_first(posts)[:10]
+
+    def test_feed_queries(self, user_client, user, another_user, follow_1,
+                          django_assert_max_num_queries):
+        self.create_posts(another_user, 25)
+        with django_assert_max_num_queries(5):
+            user_client.get(self.url)
+
+    def test_feed_bad_cursor(self, user_client):
+        response = user_client.get(self.url, {'cursor': 'not-a-cursor'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_migration_fills_timelines(self, user, another_user, user_2,
+                                       follow_1, follow_5):
+        posts = self.create_posts(another_user, 3)
+        self.create_posts(user_2, 2)
+        Follow.objects.create(user=another_user, following=user_2)
+        TimelineEntry.objects.all().delete()
+        migration = import_module('posts.migrations.0005_timelines')
+        migration.fill_timelines(apps, connection.schema_editor())
+        assert list(
+            TimelineEntry.objects.filter(user=user)
+            .order_by('-pub_date', '-post_id')
+            .values_list('post_id', flat=True)
+        ) == self.newest_first(posts), (
+            'Убедитесь, что миграция заполняет ленты существующих '
+            'подписчиков, кроме постов авторов с числом подписчиков больше '
+            '`FEED_FANOUT_LIMIT`.'
+        )
+        assert not TimelineEntry.objects.filter(user=another_user).exists()
+
+    def test_rebuild_timelines(self, settings, user, another_user, follow_1):
+        posts = self.create_posts(another_user, 5)
+        TimelineEntry.objects.all().delete()
+        settings.FEED_TIMELINE_SIZE = 3
+        out = StringIO()
+        call_command('rebuild_timelines', stdout=out)
+        assert list(
+            TimelineEntry.objects.filter(user=user)
+            .order_by('-pub_date', '-post_id')
+            .values_list('post_id', flat=True)
+        ) == self.newest_first(posts)[:3], (
+            'Убедитесь, что `rebuild_timelines` заполняет ленты последними '
+            'постами авторов, на которых подписан пользователь.'
+        )
+        assert 'Rebuilt' in out.getvalue()
@@ -0,0 +1,108 @@
+import asyncio
+import re
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from yatube_api.metrics import MetricsMiddleware, ShardedCounters, counters
+
+
+class TestMetrics:
+
+    @pytest.fixture(autouse=True)
+    def clean_counters(self):
+        counters.reset()
+        yield
+        counters.reset()
+
+    @staticmethod
+    def sample(text, metric):
+        match = re.search(rf'^{re.escape(metric)} (\S+)$', text, re.M)
+        assert match, f'Метрика `{metric}` не найдена в ответе `/metrics`.'
+        return float(match.group(1))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_metrics(self, client, user_client, post, settings):
+        settings.METRICS_TOKEN = 'secret'
+        for _ in range(3):
+            user_client.get('/api/v1/posts/')
+        user_client.post('/api/v1/posts/', data={})
+        response = client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret'
+        )
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        labels = 'route="post-list",method="GET"'
+        assert self.sample(
+            text, f'http_requests_total{{{labels},status="200"}}'
+        ) == 3, (
+            'Убедитесь, что `/metrics` считает запросы по маршрутам, '
+            'методам и статусам.'
+        )
+        assert self.sample(
+            text, 'http_requests_total{route="post-list",method="POST",'
+                  'status="400"}'
+        ) == 1
+        assert self.sample(
+            text, f'http_request_duration_seconds_bucket{{{labels},'
+                  'le="+Inf"}'
+        ) == 3
+        assert self.sample(
+            text, f'http_request_duration_seconds_count{{{labels}}}'
+        ) == 3
+        assert self.sample(text, f'db_queries_total{{{labels}}}') >= 3
+
+    @pytest.mark.django_db(transaction=True)
+    def test_async_metrics(self, async_client, post):
+        async def view(request):
+            pass
+
+        assert asyncio.iscoroutinefunction(MetricsMiddleware(view)), (
+            'Убедитесь, что `MetricsMiddleware` поддерживает асинхронный '
+            'режим и не переводит запросы ASGI в один поток.'
+        )
+
+        async def get():
+            return await async_client.get('/api/v1/posts/')
+
+        assert async_to_sync(get)().status_code == 200
+        values = counters.collect()
+        labels = (('route', 'post-list'), ('method', 'GET'))
+        assert values[
+            ('http_requests_total', labels + (('status', 200),))
+        ] == 1, 'Убедитесь, что `MetricsMiddleware` работает и под ASGI.'
+        assert values[('db_queries_total', labels)] >= 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_metrics_token(self, client, settings):
+        settings.METRICS_TOKEN = None
+        assert client.get('/metrics').status_code == 403, (
+            'Убедитесь, что без `METRICS_TOKEN` метрики недоступны.'
+        )
+        settings.METRICS_TOKEN = 'secret'
+        assert client.get('/metrics').status_code == 403
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret'
+        ).status_code == 200
+
+    def test_sharded_counters(self):
+        sharded = ShardedCounters()
+
+        def work():
+            for _ in range(1000):
+                sharded.inc('key')
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sharded.collect() == {'key': 4000}
+        assert not sharded._shards, (
+            'Убедитесь, что счётчики завершившихся потоков переносятся в '
+            'общий итог.'
+        )
+        sharded.inc('key')
+        assert sharded.collect() == {'key': 4001}
@@ -0,0 +1,64 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Post
+
+
+@pytest.mark.django_db
+class TestPostCursorPagination:
+
+    url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def posts(self, user, another_user):
+        posts = [
+            Post.objects.create(author=author, text=f'Пост {number}')
+            for number in range(25) for author in (user, another_user)
+        ]
+        # Posts with the same date are ordered by id.
+        Post.objects.filter(pk__in=[post.pk for post in posts[10:20]]).update(
+            pub_date=posts[10].pub_date
+        )
+        return Post.objects.order_by('-pub_date', '-id')
+
+    def test_cursor_pagination(self, client, posts):
+        ids, url, params = [], self.url, {'cursor': '', 'limit': 7}
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url, params)
+            assert response.status_code == HTTPStatus.OK
+            assert not any('COUNT(' in query['sql']
+                           for query in queries.captured_queries), (
+                'Убедитесь, что курсорная пагинация не считает посты.'
+            )
+            data = response.json()
+            assert 'count' not in data
+            assert len(data['results']) <= 7
+            ids.extend(post['id'] for post in data['results'])
+            url, params = data['next'], None
+        assert ids == list(posts.values_list('id', flat=True)), (
+            f'Убедитесь, что `{self.url}?cursor=` выводит все посты от новых '
+            'к старым без повторов и пропусков.'
+        )
+
+    def test_limit_offset_pagination_kept(self, client, posts):
+        data = client.get(self.url, {'limit': 2, 'offset': 2}).json()
+        assert data['count'] == posts.count(), (
+            'Убедитесь, что без параметра `cursor` пагинация по `limit` и '
+            '`offset` работает как прежде.'
+        )
+        assert isinstance(client.get(self.url).json(), list)
+
+    def test_bad_cursor(self, client):
+        response = client.get(self.url, {'cursor': 'not-a-cursor'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_benchmark_pagination(self):
+        out = StringIO()
+        call_command('benchmark_pagination', posts=100, repeat=1, stdout=out)
+        assert 'cursor' in out.getvalue()
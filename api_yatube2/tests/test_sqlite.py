@@ -0,0 +1,33 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+class TestSqliteTuning:
+
+    @staticmethod
+    def pragma(name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @pytest.mark.django_db
+    def test_sqlite_pragmas(self, settings):
+        pragmas = settings.SQLITE_PRAGMAS
+        assert self.pragma('busy_timeout') == pragmas['busy_timeout']
+        assert self.pragma('synchronous') == 1, (
+            'Убедитесь, что к новым соединениям с SQLite применяются '
+            'настройки из `SQLITE_PRAGMAS`.'
+        )
+
+    @pytest.mark.django_db
+    def test_benchmark_sqlite(self):
+        out = StringIO()
+        call_command(
+            'benchmark_sqlite', readers=2, writers=1, seconds=0.2, posts=20,
+            stdout=out
+        )
+        assert 'default:' in out.getvalue()
+        assert 'tuned:' in out.getvalue()
@@ -0,0 +1,129 @@
+import base64
+import binascii
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from posts.timelines import older_than
+
+
+class PostCursorMixin:
+    """Cursors pointing at the (pub_date, id) key of the last post.
+
+    The cursor is an opaque url-safe token `<pub_date>|<id>`; the next
+    page holds the posts after the key, newest first.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    @staticmethod
+    def encode_cursor(post):
+        raw = f'{post.pub_date.isoformat()}|{post.pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        """Return the (pub_date, id) key or None for the first page."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            pub_date, pk = raw.split('|')
+            pub_date, pk = parse_datetime(pub_date), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, pk
+
+    def paginate_posts(self, queryset, request, page_size):
+        """Return the page of posts after the key of the cursor."""
+        self.request = request
+        key = self.decode_cursor(request)
+        if key is not None:
+            queryset = queryset.filter(older_than(key))
+        # One more post tells if there is a next page.
+        posts = queryset.order_by('-pub_date', '-id')[:page_size + 1]
+        return self.set_page(list(posts), page_size)
+
+    def set_page(self, posts, page_size):
+        """Keep a page of `posts`, fetched with one extra post."""
+        self.has_next = len(posts) > page_size
+        self.page = posts[:page_size]
+        return self.page
+
+    def get_next_cursor_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[-1])
+        )
+
+    def get_cursor_response(self, data):
+        return Response({
+            'next': self.get_next_cursor_link(),
+            'results': data,
+        })
+
+
+class FeedPagination(PostCursorMixin, BasePagination):
+    """Paginate a feed by the (pub_date, id) key of the last post.
+
+    paginate_feed() takes a function returning posts by the page size and
+    the key, e.g. `posts.timelines.get_feed` with the user bound. Posts of
+    a queryset are paginated by the same key.
+    """
+
+    page_size = 10
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_posts(queryset, request, self.page_size)
+
+    def paginate_feed(self, get_page, request):
+        self.request = request
+        return self.set_page(
+            get_page(self.page_size + 1, self.decode_cursor(request)),
+            self.page_size
+        )
+
+    def get_paginated_response(self, data):
+        return self.get_cursor_response(data)
+
+
+class PostPagination(PostCursorMixin, LimitOffsetPagination):
+    """Paginate posts by limit/offset or, on request, by a cursor.
+
+    With a `cursor` query parameter (empty for the first page) posts are
+    selected by the (pub_date, id) key of the previous page: there is no
+    COUNT(*) and no OFFSET scan, so a deep page costs as much as the
+    first one. Without it the pagination is LimitOffsetPagination.
+    """
+
+    cursor_page_size = 10
+    max_cursor_page_size = 100
+
+    def is_cursor_paginated(self, request):
+        return self.cursor_query_param in request.query_params
+
+    def get_cursor_page_size(self, request):
+        return min(self.get_limit(request) or self.cursor_page_size,
+                   self.max_cursor_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginated = self.is_cursor_paginated(request)
+        if not self.cursor_paginated:
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_posts(
+            queryset, request, self.get_cursor_page_size(request)
+        )
+
+    def get_paginated_response(self, data):
+        if not self.cursor_paginated:
+            return super().get_paginated_response(data)
+        return self.get_cursor_response(data)
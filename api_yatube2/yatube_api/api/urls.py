@@ -1,13 +1,15 @@
 from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
-from api.views import GroupViewSet, PostViewSet, CommentViewSet, FollowViewSet
+from api.views import (GroupViewSet, PostViewSet, CommentViewSet,
+                       FollowViewSet, FeedViewSet)
 
 
 router = SimpleRouter()
 router.register('groups', GroupViewSet)
 router.register('posts', PostViewSet)
 router.register('follow', FollowViewSet, basename='follow')
+router.register('feed', FeedViewSet, basename='feed')
 router.register(
     r'posts/(?P<post_id>\d+)/comments', CommentViewSet, basename='comments'
 )
@@ -1,13 +1,16 @@
+from functools import partial
+
 from django.shortcuts import get_object_or_404
 
 from rest_framework import mixins
 from rest_framework import permissions
 from rest_framework import viewsets
 from rest_framework import filters
-from rest_framework.pagination import LimitOffsetPagination
 
 from posts.models import Group, Post, Follow
+from posts.timelines import get_feed
 
+from api.pagination import FeedPagination, PostPagination
 from api.serializers import (PostSerializer, GroupSerializer,
                              CommentSerializer, FollowSerializer)
 from api.permissions import IsObjectAuthorOrReadOnly
@@ -25,7 +28,7 @@ class PostViewSet(viewsets.ModelViewSet):
         permissions.IsAuthenticatedOrReadOnly,
         IsObjectAuthorOrReadOnly,
     )
-    pagination_class = LimitOffsetPagination
+    pagination_class = PostPagination
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -61,3 +64,25 @@ class FollowViewSet(mixins.CreateModelMixin,
     def get_queryset(self):
         follows = Follow.objects.filter(user__exact=self.request.user)
         return follows
+
+
+class FeedViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Posts of the authors the user follows, newest first."""
+
+    serializer_class = PostSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = FeedPagination
+
+    def get_queryset(self):
+        """Return posts of the followed authors, the feed of the user."""
+        return Post.objects.filter(
+            author__following__user_id=self.request.user.pk
+        )
+
+    def list(self, request, *args, **kwargs):
+        """Read the page of the feed from the user's timeline."""
+        posts = self.paginator.paginate_feed(
+            partial(get_feed, request.user), request
+        )
+        serializer = self.get_serializer(posts, many=True)
+        return self.get_paginated_response(serializer.data)
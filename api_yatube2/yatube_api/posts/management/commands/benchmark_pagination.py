@@ -0,0 +1,97 @@
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.pagination import PostPagination
+from posts.models import Post
+
+User = get_user_model()
+BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = ('Compare the time to get a page of posts at growing depths '
+            'with limit/offset and with cursor pagination.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Times to get every page; the median is shown.'
+        )
+
+    def handle(self, *args, **options):
+        n_posts, limit = options['posts'], options['limit']
+        depths = sorted({
+            depth for depth in (0, 1000, 10000, 100000, n_posts // 2,
+                                n_posts - limit)
+            if 0 <= depth <= n_posts - limit
+        })
+        alias = 'benchmark_pagination'
+        with tempfile.TemporaryDirectory() as directory:
+            connections.settings[alias] = {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': str(Path(directory) / 'posts.sqlite3'),
+            }
+            try:
+                self.prepare(alias, n_posts)
+                self.stdout.write(
+                    f'{"page at":>10} {"limit/offset, ms":>17} '
+                    f'{"cursor, ms":>11}'
+                )
+                posts = Post.objects.using(alias)
+                for depth in depths:
+                    offset_time = self.measure(
+                        posts, {'limit': limit, 'offset': depth},
+                        options['repeat']
+                    )
+                    cursor_time = self.measure(
+                        posts, {'limit': limit,
+                                'cursor': self.get_cursor(posts, depth)},
+                        options['repeat']
+                    )
+                    self.stdout.write(
+                        f'{depth:>10} {offset_time:>17.2f} '
+                        f'{cursor_time:>11.2f}'
+                    )
+            finally:
+                connections[alias].close()
+                del connections[alias]
+                del connections.settings[alias]
+
+    def prepare(self, alias, n_posts):
+        call_command('migrate', database=alias, verbosity=0)
+        author = User.objects.db_manager(alias).create_user('benchmark')
+        for first in range(0, n_posts, BATCH_SIZE):
+            Post.objects.using(alias).bulk_create(
+                Post(text=f'Текст публикации {number}', author=author)
+                for number in range(first, min(first + BATCH_SIZE, n_posts))
+            )
+
+    @staticmethod
+    def get_cursor(posts, depth):
+        """Return the cursor of the page after `depth` posts."""
+        if not depth:
+            return ''
+        last = posts.order_by('-pub_date', '-id')[depth - 1]
+        return PostPagination.encode_cursor(last)
+
+    @staticmethod
+    def measure(posts, params, repeat):
+        """Return the median time of getting the page, ms."""
+        request = Request(APIRequestFactory().get('/api/v1/posts/', params))
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            PostPagination().paginate_queryset(posts.all(), request)
+            times.append(time.perf_counter() - started)
+        return statistics.median(times) * 1000
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django_perf.sqlite import BenchmarkCommand
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class Command(BenchmarkCommand):
+
+    def create_data(self, alias, n_posts):
+        author = User.objects.db_manager(alias).create_user('benchmark')
+        group = Group.objects.using(alias).create(
+            title='Группа', slug='benchmark', description='Описание'
+        )
+        Post.objects.using(alias).bulk_create(
+            (Post(text=f'Текст публикации {i} ' * 20,
+                  author=author, group=group)
+             for i in range(n_posts)),
+            batch_size=1000
+        )
+        self.author_id = author.pk
+        self.post_ids = list(
+            Post.objects.using(alias).values_list('pk', flat=True)[:100]
+        )
+
+    def read(self, alias):
+        list(Post.objects.using(alias)
+             .select_related('author', 'group')[:10])
+
+    def write(self, alias, number):
+        Comment.objects.using(alias).create(
+            post_id=self.post_ids[number % len(self.post_ids)],
+            author_id=self.author_id, text='Комментарий'
+        )
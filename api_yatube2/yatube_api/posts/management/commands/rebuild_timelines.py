@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.models import TimelineEntry
+from posts.timelines import invalidate_celebrities, rebuild_timeline
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Refill feed timelines with the latest posts of followed '
+            'authors, e.g. after FEED_FANOUT_LIMIT is changed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Users to rebuild timelines of; all users by default.'
+        )
+
+    def handle(self, *args, **options):
+        # Count followers again, as FEED_FANOUT_LIMIT may have changed.
+        invalidate_celebrities()
+        users = User.objects.order_by('pk')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+        rebuilt = 0
+        for user_id in users.values_list('pk', flat=True).iterator():
+            rebuild_timeline(user_id)
+            rebuilt += 1
+        self.stdout.write(
+            f'Rebuilt {rebuilt} timelines, '
+            f'{TimelineEntry.objects.count()} entries in total.'
+        )
@@ -0,0 +1,84 @@
+# Generated by Django 3.2.16 on 2026-10-18 14:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+
+
+def fill_timelines(apps, schema_editor):
+    """Copy the latest posts of followed authors into the new timelines.
+
+    Like `rebuild_timelines`, posts of authors with more than
+    FEED_FANOUT_LIMIT followers are left to be merged on read.
+    """
+    db = schema_editor.connection.alias
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    follows = Follow.objects.using(db)
+    celebrities = list(
+        follows.values('following')
+        .annotate(followers=models.Count('id'))
+        .filter(followers__gt=getattr(settings, 'FEED_FANOUT_LIMIT', 1000))
+        .values_list('following', flat=True)
+    )
+    size = getattr(settings, 'FEED_TIMELINE_SIZE', 1000)
+    readers = follows.order_by('user').values_list('user', flat=True)
+    for user_id in readers.distinct().iterator():
+        posts = Post.objects.using(db).filter(
+            author__in=follows.filter(user=user_id).values('following')
+        ).exclude(author__in=celebrities).order_by('-pub_date', '-id')
+        TimelineEntry.objects.using(db).bulk_create(
+            (TimelineEntry(user_id=user_id, post_id=post_id,
+                           pub_date=pub_date)
+             for post_id, pub_date in posts.values_list(
+                 'id', 'pub_date')[:size]),
+            batch_size=BATCH_SIZE
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0004_auto_20250227_0408'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Записи ленты',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='post_author_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='timelineentry',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='posts.post', verbose_name='Пост'),
+        ),
+        migrations.AddField(
+            model_name='timelineentry',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL, verbose_name='Читатель'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-pub_date', '-post'], name='timeline_user_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_timeline_entry'),
+        ),
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
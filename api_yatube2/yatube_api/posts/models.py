@@ -72,6 +72,15 @@ class Post(models.Model):
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
         ordering = ('-pub_date',)
+        indexes = [
+            # Pages of posts by a (pub_date, id) cursor.
+            models.Index(fields=['-pub_date', '-id'], name='post_date_idx'),
+            # Posts of an author, newest first: timelines and the feed.
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return Truncator(self.text).chars(64)
@@ -145,3 +154,41 @@ class Follow(models.Model):
             ),
         ]
         # TODO: Добавить user==following constraint
+
+
+class TimelineEntry(models.Model):
+    """Timeline entry model for Data Base.
+
+    A post in the feed of a follower of its author, written when the post
+    is created (fan-out on write), see `posts.timelines`.
+    Columns:
+        user - FK(User), delete cascade, related name = 'timeline';
+        post - FK(Post), delete cascade, related name = 'timeline_entries';
+        pub_date - DateTime, a copy of post.pub_date to order the feed by.
+    """
+
+    user = models.ForeignKey(
+        User, verbose_name='Читатель',
+        on_delete=models.CASCADE, related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post, verbose_name='Пост',
+        on_delete=models.CASCADE, related_name='timeline_entries'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_date_idx'
+            ),
+        ]
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from posts import timelines
+from posts.models import Follow, Post
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, raw=False, **kwargs):
+    """Add a new post to the timelines of its author's followers."""
+    if created and not raw:
+        timelines.fan_out_post(instance)
+
+
+@receiver(post_save, sender=Follow)
+def fill_timeline(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        timelines.follow_author(instance.user_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def clean_timeline(sender, instance, **kwargs):
+    timelines.unfollow_author(instance.user_id, instance.following_id)
@@ -0,0 +1,176 @@
+"""Feeds of posts by followed authors, newest first.
+
+Posts of most authors are copied into the timelines of their followers
+when they are written (fan-out on write), so reading a feed is a range
+scan over the reader's TimelineEntry rows. A post by an author with more
+than FEED_FANOUT_LIMIT followers would write that many rows: posts of
+such authors are not copied, but merged into the feeds of their
+followers when the feeds are read (fan-out on read). When such an author
+is left with FEED_FANOUT_LIMIT followers, their latest posts are copied
+into the timelines of the followers.
+
+Feeds are paginated by the (pub_date, id) key of the last post seen.
+`python manage.py rebuild_timelines` refills the timelines, e.g. after
+FEED_FANOUT_LIMIT is changed. With several server processes the cache
+must be shared by them (CACHE_LOCATION setting), see get_celebrity_ids().
+"""
+import heapq
+from functools import partial
+from typing import FrozenSet, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from posts.models import Follow, Post, TimelineEntry
+
+CELEBRITIES_KEY = 'posts:feed_celebrities'
+BATCH_SIZE = 1000
+
+
+def get_fanout_limit() -> int:
+    return getattr(settings, 'FEED_FANOUT_LIMIT', 1000)
+
+
+def get_timeline_size() -> int:
+    """Return how many posts of an author are copied on follow/rebuild."""
+    return getattr(settings, 'FEED_TIMELINE_SIZE', 1000)
+
+
+def get_celebrity_ids() -> FrozenSet[int]:
+    """Return ids of authors whose posts are merged on read.
+
+    Both the writers and the readers of timelines take the set from the
+    cache, so a post is copied or merged, but never missed. This needs a
+    cache shared by all server processes (CACHE_LOCATION setting).
+    """
+    ids = cache.get(CELEBRITIES_KEY)
+    if ids is None:
+        ids = frozenset(
+            Follow.objects.values('following')
+            .annotate(followers=Count('id'))
+            .filter(followers__gt=get_fanout_limit())
+            .values_list('following', flat=True)
+        )
+        cache.set(
+            CELEBRITIES_KEY, ids,
+            getattr(settings, 'FEED_CELEBRITIES_CACHE_TIMEOUT', 5 * 60)
+        )
+    return ids
+
+
+def invalidate_celebrities() -> None:
+    cache.delete(CELEBRITIES_KEY)
+
+
+def older_than(key, date_field='pub_date', id_field='id') -> Q:
+    """Select rows after the (pub_date, id) key, newest first.
+
+    The redundant `pub_date <= key` lets the database seek to the key in
+    a (pub_date, id) index instead of scanning the index up to it.
+    """
+    pub_date, pk = key
+    return Q(**{f'{date_field}__lte': pub_date}) & (
+        Q(**{f'{date_field}__lt': pub_date})
+        | Q(**{date_field: pub_date, f'{id_field}__lt': pk})
+    )
+
+
+def add_entries(user_ids, posts) -> None:
+    """Copy (id, pub_date) pairs of posts into timelines of the users."""
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+         for user_id in user_ids for post_id, pub_date in posts),
+        batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def fan_out_post(post) -> None:
+    """Copy a new post into the timelines of its author's followers."""
+    if post.author_id in get_celebrity_ids():
+        return
+    followers = (Follow.objects.filter(following_id=post.author_id)
+                 .values_list('user_id', flat=True))
+    add_entries(followers.iterator(), [(post.pk, post.pub_date)])
+
+
+def latest_posts(**filters):
+    """Return (id, pub_date) of the latest posts to copy into a timeline."""
+    return (Post.objects.filter(**filters)
+            .order_by('-pub_date', '-id').values_list('id', 'pub_date'))
+
+
+def follow_author(user_id, author_id) -> None:
+    """Copy the latest posts of a newly followed author."""
+    if author_id not in get_celebrity_ids():
+        add_entries([user_id], latest_posts(
+            author_id=author_id
+        )[:get_timeline_size()])
+
+
+def unfollow_author(user_id, author_id) -> None:
+    """Drop the posts of an author, who may stop being a celebrity."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+    if author_id in get_celebrity_ids() and Follow.objects.filter(
+        following_id=author_id
+    ).count() <= get_fanout_limit():
+        # Before the commit other processes would still count the follow.
+        transaction.on_commit(partial(leave_celebrities, author_id))
+
+
+def leave_celebrities(author_id) -> None:
+    """Copy the latest posts of a former celebrity to their followers.
+
+    Posts written after the set of celebrities is dropped are copied by
+    fan_out_post(), the earlier ones are copied here.
+    """
+    invalidate_celebrities()
+    posts = list(latest_posts(author_id=author_id)[:get_timeline_size()])
+    followers = (Follow.objects.filter(following_id=author_id)
+                 .values_list('user_id', flat=True))
+    for user_id in followers.iterator():
+        add_entries([user_id], posts)
+
+
+def rebuild_timeline(user_id) -> None:
+    """Refill the timeline with the latest posts of followed authors."""
+    posts = latest_posts(author__following__user_id=user_id).exclude(
+        author_id__in=get_celebrity_ids()
+    )
+    with transaction.atomic():
+        TimelineEntry.objects.filter(user_id=user_id).delete()
+        add_entries([user_id], posts[:get_timeline_size()])
+
+
+def get_feed(user, limit: int,
+             after: Optional[Tuple] = None) -> List[Post]:
+    """Return up to `limit` posts of the user's feed after the key."""
+    entries = (TimelineEntry.objects.filter(user=user)
+               .select_related('post__author')
+               .order_by('-pub_date', '-post_id'))
+    if after is not None:
+        entries = entries.filter(older_than(after, id_field='post_id'))
+    sources = [[entry.post for entry in entries[:limit]]]
+
+    celebrities = get_celebrity_ids()
+    if celebrities:
+        merged = Post.objects.select_related('author').filter(
+            author_id__in=Follow.objects.filter(
+                user=user, following_id__in=celebrities
+            ).values('following_id')
+        )
+        if after is not None:
+            merged = merged.filter(older_than(after))
+        sources.append(merged.order_by('-pub_date', '-id')[:limit])
+
+    posts = {}
+    for post in heapq.merge(*sources, reverse=True,
+                            key=lambda post: (post.pub_date, post.pk)):
+        # A post may be in both, if its author has become a celebrity since.
+        posts.setdefault(post.pk, post)
+        if len(posts) == limit:
+            break
+    return list(posts.values())
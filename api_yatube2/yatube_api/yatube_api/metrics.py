@@ -0,0 +1,202 @@
+"""Request metrics in the Prometheus text exposition format.
+
+MetricsMiddleware counts requests, 5xx responses and database queries
+and observes latency per route (URL name) and method. The `/metrics`
+view exposes them to a Prometheus scraper.
+
+Every thread increments its own shard of the counters, so requests
+never wait for a lock; the shards are summed when metrics are scraped.
+Shards of finished threads are added to the base totals and dropped,
+so servers starting a thread per request do not pile them up.
+Every server process has its own counters, which Prometheus tells apart
+by the `instance` label.
+"""
+import asyncio
+import bisect
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django_perf import get_request_stats, get_view_name, mark_async_capable
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Upper bounds of the latency histogram buckets, seconds.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS = (
+    ('http_requests_total', 'counter',
+     'Requests by route, method and status.'),
+    ('http_request_errors_total', 'counter',
+     'Requests that ended with a 5xx status.'),
+    ('http_request_duration_seconds', 'histogram',
+     'Time to handle a request.'),
+    ('db_queries_total', 'counter',
+     'Database queries made by requests.'),
+    ('db_query_duration_seconds_total', 'counter',
+     'Time spent in database queries made by requests.'),
+)
+
+
+class ShardedCounters:
+    """Counters keyed by (metric, labels) with a shard per thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+        # Shards by thread and totals of the finished threads.
+        self._shards = {}
+        self._base = {}
+        # Only taken when a thread creates its shard and on collection.
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._fold_finished()
+                self._shards[threading.current_thread()] = shard
+            return shard
+
+    def _fold_finished(self):
+        """Add shards of finished threads to the base; hold the lock."""
+        for thread in [thread for thread in self._shards
+                       if not thread.is_alive()]:
+            # Nobody writes to the shard of a finished thread.
+            for key, value in self._shards.pop(thread).items():
+                self._base[key] = self._base.get(key, 0) + value
+
+    def inc(self, key, value=1):
+        shard = self._shard()
+        shard[key] = shard.get(key, 0) + value
+
+    def collect(self):
+        with self._lock:
+            self._fold_finished()
+            shards = list(self._shards.values())
+            totals = dict(self._base)
+        for shard in shards:
+            # dict.copy() is atomic, unlike iteration over a dict that
+            # another thread may change.
+            for key, value in shard.copy().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def reset(self):
+        with self._lock:
+            self._base.clear()
+            for shard in self._shards.values():
+                shard.clear()
+
+
+counters = ShardedCounters()
+
+
+def observe(name, labels, value):
+    """Add a value to a histogram."""
+    index = bisect.bisect_left(DURATION_BUCKETS, value)
+    counters.inc((f'{name}_bucket', labels + (('le', index),)))
+    counters.inc((f'{name}_sum', labels), value)
+    counters.inc((f'{name}_count', labels))
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\')
+                         .replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return f'{{{pairs}}}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_histogram(name, values):
+    lines = []
+    for key in sorted(key for key in values if key[0] == f'{name}_count'):
+        labels = key[1]
+        cumulative = 0
+        for index, bound in enumerate(DURATION_BUCKETS + ('+Inf',)):
+            cumulative += values.get(
+                (f'{name}_bucket', labels + (('le', index),)), 0
+            )
+            lines.append(
+                f'{name}_bucket{format_labels(labels + (("le", bound),))} '
+                f'{cumulative}'
+            )
+        lines.append(f'{name}_sum{format_labels(labels)} '
+                     f'{format_value(values[(f"{name}_sum", labels)])}')
+        lines.append(f'{name}_count{format_labels(labels)} {values[key]}')
+    return lines
+
+
+def render_metrics():
+    values = counters.collect()
+    lines = []
+    for name, kind, help_text in METRICS:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            lines.extend(render_histogram(name, values))
+            continue
+        for key in sorted(key for key in values if key[0] == name):
+            lines.append(
+                f'{name}{format_labels(key[1])} {format_value(values[key])}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """Count requests; must come after PerfMiddleware in MIDDLEWARE."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        mark_async_capable(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, duration):
+        labels = (('route', get_view_name(request)),
+                  ('method', request.method))
+        status = response.status_code
+        counters.inc(
+            ('http_requests_total', labels + (('status', status),))
+        )
+        if status >= 500:
+            counters.inc(('http_request_errors_total', labels))
+        observe('http_request_duration_seconds', labels, duration)
+        stats = get_request_stats()
+        if stats is not None:
+            counters.inc(('db_queries_total', labels), stats.queries)
+            counters.inc(
+                ('db_query_duration_seconds_total', labels), stats.sql_time
+            )
+
+
+def metrics(request):
+    """Expose the metrics to requests with METRICS_TOKEN, if it is set."""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token or (request.META.get('HTTP_AUTHORIZATION')
+                     != f'Bearer {token}'):
+        raise PermissionDenied
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
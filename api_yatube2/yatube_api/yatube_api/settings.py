@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from datetime import timedelta
@@ -18,10 +19,13 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'djoser',
+    'django_perf',
     'api',
     'posts',
 ]
 MIDDLEWARE = [
+    'django_perf.PerfMiddleware',
+    'yatube_api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -29,6 +33,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'django_perf.routers.ReplicaMiddleware',
 ]
 ROOT_URLCONF = 'yatube_api.urls'
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -54,9 +59,78 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse connections between requests instead of reopening the file.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# SQLite tuning applied to every new connection (see django_perf/sqlite.py);
+# `python manage.py benchmark_sqlite` compares it with the defaults.
+SQLITE_PRAGMAS = {
+    # Readers do not block the writer and the writer does not block them.
+    'journal_mode': 'WAL',
+    # With WAL, fsync only on checkpoints; a power loss may lose the last
+    # transactions but never corrupts the database.
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Page cache per connection, negative values are KiB.
+    'cache_size': -64 * 1024,
+    # Milliseconds to wait for a lock before "database is locked".
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+# Read replicas for `list` and `retrieve` actions, see
+# django_perf/routers.py. Locally a copy of the database will do:
+# DATABASE_REPLICAS=replica.sqlite3
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+        filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / name,
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['django_perf.routers.ReplicaRouter']
+# Seconds a client reads from the primary after a write.
+REPLICA_PIN_SECONDS = 5
+
+# Prometheus metrics at /metrics; the scraper must send
+# `Authorization: Bearer <token>`. Without a token /metrics is disabled.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Feeds at /api/v1/feed/, see posts/timelines.py. Posts of authors with
+# up to FEED_FANOUT_LIMIT followers are copied into the followers'
+# timelines; posts of others are merged into feeds when they are read.
+FEED_FANOUT_LIMIT = 1000
+# Latest posts of an author copied when a user follows them.
+FEED_TIMELINE_SIZE = 1000
+FEED_CELEBRITIES_CACHE_TIMEOUT = 5 * 60
+
+# Writers and readers of feeds share the set of authors whose posts are
+# merged on read, and clients are pinned to the primary database
+# (REPLICA_PIN_SECONDS) through this cache, so every server process must
+# use the same one: memcached at CACHE_LOCATION, e.g.
+# CACHE_LOCATION=127.0.0.1:11211. Without it the memory of a single
+# process is used, which is only correct with one worker.
+CACHE_LOCATION = os.getenv('CACHE_LOCATION')
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_LOCATION,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation.
 AUTH_PASSWORD_VALIDATORS = [
     {
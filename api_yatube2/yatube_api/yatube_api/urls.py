@@ -3,9 +3,15 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
+from django_perf import slow_queries_view, slowest_views
+
+from yatube_api.metrics import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
+    path('perf/slowest/', slowest_views, name='slowest_views'),
+    path('perf/slow-queries/', slow_queries_view, name='slow_queries'),
     path('api/v1/', include('api.urls')),
     path(
         'redoc/',
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Post, Category, Location, Comment
+from .models import Post, Category, Location, Comment, ImageJob
+from .search import search_posts
 
 
 class CommentInline(admin.StackedInline):
@@ -23,10 +24,16 @@ class PostAdmin(admin.ModelAdmin):
         'created_at'
     )
     list_editable = ('is_published', )
-    search_fields = ('title', 'text', 'author')
+    search_fields = ('title', 'text')
     list_filter = ('is_published', 'category', 'location')
     list_display_links = ('title', )
 
+    def get_search_results(self, request, queryset, search_term):
+        """Look posts up in the full-text index instead of LIKE scans."""
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -68,4 +75,18 @@ class CommentAdmin(admin.ModelAdmin):
     list_display_links = ('post', )
 
 
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'post',
+        'status',
+        'attempts',
+        'run_after',
+        'error',
+        'created_at'
+    )
+    list_filter = ('status', )
+    list_display_links = ('post', )
+
+
 admin.site.empty_value_display = 'Не задано'
@@ -0,0 +1,217 @@
+"""Batched import and export of fixtures.
+
+`bulkload` reads fixtures in the `loaddata` format (a JSON array or one
+object per line) as a stream and saves them with bulk_create() instead
+of one save() per object; `bulkdump` writes them back in primary key
+batches. Neither sends model signals, so `refresh_blog_data()` updates
+the comment counters, the search index and the feed cache afterwards.
+
+Multi-table inherited models are not supported by bulk_create().
+"""
+import json
+from contextlib import contextmanager
+from io import StringIO
+
+from django.core import serializers
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from blog.caching import (
+    invalidate_feeds, invalidate_next_visibility_change,
+    invalidate_post_counts
+)
+from blog.search import get_backend
+
+READ_SIZE = 1 << 16
+JSON_TYPES = (bool, int, float, str)
+
+
+def iter_json_records(stream):
+    """Yield objects of a JSON array or of JSON lines from a text stream.
+
+    The stream is decoded READ_SIZE characters at a time, so the memory
+    used depends on the size of a single object, not of the file.
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(READ_SIZE).lstrip()
+    is_array = buffer.startswith('[')
+    if is_array:
+        buffer = buffer[1:]
+    separators = ', \t\r\n' if is_array else ' \t\r\n'
+    eof = False
+    while True:
+        buffer = buffer.lstrip(separators)
+        if is_array and buffer.startswith(']'):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if not eof:
+                # The object may continue in the next chunk.
+                chunk = stream.read(READ_SIZE)
+                eof = not chunk
+                buffer += chunk
+                continue
+            if buffer or is_array:
+                raise
+            return
+        yield record
+        buffer = buffer[end:]
+
+
+@contextmanager
+def keep_timestamps(model):
+    """Let bulk_create() save auto_now(_add) values of the model as they are.
+
+    bulk_create() calls pre_save(), which overwrites them with the current
+    time, while `loaddata` keeps them. Yield the affected fields.
+    """
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False)
+              or getattr(field, 'auto_now_add', False)]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def save_batch(model, batch, using=DEFAULT_DB_ALIAS):
+    """Save deserialized objects of one model with their m2m relations."""
+    instances = [deserialized.object for deserialized in batch]
+    with keep_timestamps(model) as timestamp_fields:
+        # Objects without a timestamp get the current time, as on save().
+        now = timezone.now()
+        for field in timestamp_fields:
+            for instance in instances:
+                if getattr(instance, field.attname) is None:
+                    setattr(instance, field.attname, now)
+        save_instances(model, instances, using)
+    for deserialized in batch:
+        for name, values in (deserialized.m2m_data or {}).items():
+            if values:
+                getattr(deserialized.object, name).set(values)
+
+
+def save_instances(model, instances, using):
+    """Insert new objects and update the existing ones, like loaddata."""
+    manager = model._base_manager.using(using)
+    pks = [instance.pk for instance in instances if instance.pk is not None]
+    existing = set(
+        manager.filter(pk__in=pks).values_list('pk', flat=True)
+    ) if pks else set()
+    manager.bulk_create(
+        [instance for instance in instances if instance.pk not in existing]
+    )
+    if existing:
+        manager.bulk_update(
+            [instance for instance in instances if instance.pk in existing],
+            [field.name for field in model._meta.concrete_fields
+             if not field.primary_key]
+        )
+
+
+def load_records(records, batch_size, using=DEFAULT_DB_ALIAS):
+    """Save fixture records in batches of consecutive objects of a model.
+
+    Return the number of saved objects per model.
+    """
+    counts = {}
+    model, batch = None, []
+    for deserialized in serializers.deserialize(
+            'python', records, using=using, ignorenonexistent=True
+    ):
+        obj_model = type(deserialized.object)
+        if batch and (obj_model is not model or len(batch) >= batch_size):
+            save_batch(model, batch, using)
+            batch = []
+        model = obj_model
+        batch.append(deserialized)
+        counts[model] = counts.get(model, 0) + 1
+    if batch:
+        save_batch(model, batch, using)
+    return counts
+
+
+def to_record(obj, m2m_values):
+    """Serialize an object like the `python` serializer does."""
+    fields = {}
+    for field in obj._meta.concrete_fields:
+        if field.primary_key:
+            continue
+        if field.remote_field:
+            fields[field.name] = getattr(obj, field.attname)
+            continue
+        value = field.value_from_object(obj)
+        # Unlike DjangoJSONEncoder, value_to_string() keeps microseconds.
+        fields[field.name] = (
+            value if value is None or isinstance(value, JSON_TYPES)
+            else field.value_to_string(obj)
+        )
+    for name, values in m2m_values.items():
+        fields[name] = values.get(obj.pk, [])
+    return {'model': obj._meta.label_lower, 'pk': obj.pk, 'fields': fields}
+
+
+def get_m2m_values(model, pks):
+    """Return {field name: {pk: [related pks]}} for auto-created m2m."""
+    values = {}
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        if not through._meta.auto_created:
+            continue
+        related = values[field.name] = {}
+        rows = through._base_manager.filter(
+            **{f'{field.m2m_field_name()}__in': pks}
+        ).values_list(field.m2m_field_name(), field.m2m_reverse_field_name())
+        for pk, related_pk in rows:
+            related.setdefault(pk, []).append(related_pk)
+    return values
+
+
+def iter_model_records(model, batch_size, using=DEFAULT_DB_ALIAS):
+    """Yield fixture records of all objects of the model by pk batches."""
+    queryset = model._base_manager.using(using).order_by('pk')
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(
+            pk__gt=last_pk
+        )
+        objects = list(batch[:batch_size])
+        if not objects:
+            return
+        m2m_values = get_m2m_values(model, [obj.pk for obj in objects])
+        for obj in objects:
+            yield to_record(obj, m2m_values)
+        last_pk = objects[-1].pk
+
+
+def dump_records(records, stream, jsonl=False):
+    """Write records as a JSON array or as JSON lines; return the count."""
+    count = 0
+    if not jsonl:
+        stream.write('[')
+    for record in records:
+        if not jsonl and count:
+            stream.write(',')
+        stream.write(json.dumps(record, cls=DjangoJSONEncoder,
+                                ensure_ascii=False))
+        stream.write('\n')
+        count += 1
+    if not jsonl:
+        stream.write(']\n')
+    return count
+
+
+def refresh_blog_data(using=DEFAULT_DB_ALIAS):
+    """Update what post signals maintain after a bulk import."""
+    call_command('recount_comments', database=using, stdout=StringIO())
+    get_backend(using).rebuild(using)
+    invalidate_feeds()
+    invalidate_post_counts()
+    invalidate_next_visibility_change()
@@ -0,0 +1,128 @@
+import hashlib
+import math
+import time
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from blog.models import Post
+
+FEED_VERSION_KEY = 'blog:feed_version'
+NEXT_PUBLICATION_KEY = 'blog:next_publication'
+POST_COUNT_KEY = 'blog:post_count:{}'
+# The count of all published posts, kept up to date by `blog.signals`.
+FEED_POST_COUNT = 'feed'
+
+
+def cap_timeout(timeout: Optional[int]) -> Optional[int]:
+    """Cache for at most CACHE_STALE_SECONDS, if the setting is set.
+
+    It is set when every process has a cache of its own, which the
+    invalidation in other processes doesn't reach.
+    """
+    limit = getattr(settings, 'CACHE_STALE_SECONDS', None)
+    if limit is None:
+        return timeout
+    return limit if timeout is None else min(timeout, limit)
+
+
+def get_feed_version() -> int:
+    """Return the current version of the cached feed pages."""
+    return cache.get_or_set(FEED_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_feeds() -> None:
+    """Make every cached feed page stale.
+
+    A fresh timestamp is used instead of incrementing the counter so the
+    version never goes back to an old value after a cache eviction.
+    """
+    cache.set(FEED_VERSION_KEY, time.time_ns(), None)
+
+
+def feed_page_key(request) -> str:
+    """Return the cache key of a feed page for the current feed version."""
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:feed_page:{get_feed_version()}:{path}'
+
+
+def get_next_visibility_change() -> Optional[datetime]:
+    """Return the moment the next scheduled post becomes visible.
+
+    The value is cached until that moment; `blog.signals` drops it when
+    posts change. None means no post is scheduled.
+    """
+    timestamp = cache.get(NEXT_PUBLICATION_KEY)
+    if timestamp is None:
+        next_pub_date = Post.objects.scheduled().aggregate(
+            next_pub_date=Min('pub_date')
+        )['next_pub_date']
+        timestamp = next_pub_date.timestamp() if next_pub_date else 0
+        cache.set(
+            NEXT_PUBLICATION_KEY, timestamp,
+            cap_timeout(seconds_until(next_pub_date) if next_pub_date
+                        else None)
+        )
+    if not timestamp:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def invalidate_next_visibility_change() -> None:
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def seconds_until(moment: datetime) -> int:
+    """Return whole seconds left until the moment, at least one."""
+    return max(1, math.ceil((moment - timezone.now()).total_seconds()))
+
+
+def post_count_key(name: str) -> str:
+    return POST_COUNT_KEY.format(name)
+
+
+def get_post_count_limit() -> Optional[int]:
+    """Return the number of posts above which counts are estimated."""
+    return getattr(settings, 'POST_COUNT_LIMIT', 10000)
+
+
+def get_post_count_timeout() -> int:
+    """Return seconds to cache post counts for.
+
+    Counts expire after POST_COUNT_CACHE_TIMEOUT or when the next
+    scheduled post is published, whichever is earlier.
+    """
+    timeout = getattr(settings, 'POST_COUNT_CACHE_TIMEOUT', 60)
+    next_change = get_next_visibility_change()
+    if next_change is not None:
+        timeout = min(timeout, seconds_until(next_change))
+    return cap_timeout(timeout)
+
+
+def get_exact_post_count(name: str) -> Optional[int]:
+    """Return the cached count if it is cached and not an estimate."""
+    count = cache.get(post_count_key(name))
+    limit = get_post_count_limit()
+    if count is None or (limit is not None and count > limit):
+        return None
+    return count
+
+
+def adjust_post_count(name: str, delta: int) -> None:
+    """Add delta to the cached count, if it is cached."""
+    if not delta or get_exact_post_count(name) is None:
+        return
+    try:
+        cache.incr(post_count_key(name), delta)
+    except ValueError:
+        # The count expired meanwhile.
+        pass
+
+
+def invalidate_post_counts() -> None:
+    """Make the next feed page count the published posts again."""
+    cache.delete(post_count_key(FEED_POST_COUNT))
@@ -0,0 +1,85 @@
+"""Database-backed queue of post image jobs.
+
+Views only enqueue a job; `process_image_jobs` claims jobs in batches,
+resizes images in a process pool and retries failures with exponential
+backoff.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from blog.models import ImageJob
+
+RETRY_DELAY = 30  # Seconds before the first retry, doubled every attempt.
+
+
+def enqueue_image_job(post):
+    """Queue resizing of the post image unless it is already queued."""
+    job, _ = ImageJob.objects.get_or_create(
+        post=post, status=ImageJob.Status.PENDING
+    )
+    return job
+
+
+def claim_jobs(worker_id, limit):
+    """Lock up to `limit` due jobs for the worker and return them.
+
+    The conditional UPDATE makes sure a job is never claimed by two
+    workers at once.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job_ids = list(
+            ImageJob.objects.filter(
+                status=ImageJob.Status.PENDING, run_after__lte=now
+            ).values_list('pk', flat=True)[:limit]
+        )
+        ImageJob.objects.filter(
+            pk__in=job_ids, status=ImageJob.Status.PENDING
+        ).update(
+            status=ImageJob.Status.RUNNING, locked_by=worker_id,
+            locked_at=now, attempts=F('attempts') + 1
+        )
+    return list(
+        ImageJob.objects.select_related('post').filter(
+            pk__in=job_ids, status=ImageJob.Status.RUNNING,
+            locked_by=worker_id
+        )
+    )
+
+
+def complete_job(job):
+    job.delete()
+
+
+def fail_job(job, error, max_attempts):
+    """Schedule a retry or give up after max_attempts."""
+    job.error = str(error)
+    if job.attempts >= max_attempts:
+        job.status = ImageJob.Status.FAILED
+    else:
+        job.status = ImageJob.Status.PENDING
+        job.run_after = timezone.now() + timedelta(
+            seconds=RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+    job.save(update_fields=['status', 'error', 'run_after'])
+
+
+def requeue_stale_jobs(older_than):
+    """Return jobs of crashed workers to the queue."""
+    return ImageJob.objects.filter(
+        status=ImageJob.Status.RUNNING,
+        locked_at__lt=timezone.now() - older_than
+    ).update(status=ImageJob.Status.PENDING, locked_by='')
+
+
+def queue_stats():
+    """Return the number of jobs in every status."""
+    stats = dict.fromkeys(ImageJob.Status.values, 0)
+    stats.update(
+        ImageJob.objects.order_by().values_list('status')
+        .annotate(total=Count('pk'))
+    )
+    return stats
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django_perf.sqlite import BenchmarkCommand
+
+from blog.models import Category, Comment, Post
+
+User = get_user_model()
+
+
+class Command(BenchmarkCommand):
+
+    def create_data(self, alias, n_posts):
+        author = User.objects.db_manager(alias).create_user('benchmark')
+        category = Category.objects.using(alias).create(
+            title='Категория', description='Описание', slug='benchmark'
+        )
+        now = timezone.now()
+        Post.objects.using(alias).bulk_create(
+            (Post(title=f'Публикация {i}', text='Текст публикации ' * 20,
+                  pub_date=now, author=author, category=category)
+             for i in range(n_posts)),
+            batch_size=1000
+        )
+        self.author_id = author.pk
+        self.post_ids = list(
+            Post.objects.using(alias).values_list('pk', flat=True)[:100]
+        )
+
+    def read(self, alias):
+        list(Post.objects.using(alias).published()
+             .with_feed_relations().order_by('-pub_date')[:10])
+
+    def write(self, alias, number):
+        # The Comment signals also update Post.comment_count.
+        Comment.objects.using(alias).create(
+            post_id=self.post_ids[number % len(self.post_ids)],
+            author_id=self.author_id, text='Комментарий'
+        )
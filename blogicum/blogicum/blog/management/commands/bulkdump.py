@@ -0,0 +1,55 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.bulk import dump_records, iter_model_records
+
+DEFAULT_MODELS = (
+    'auth.User', 'blog.Category', 'blog.Location', 'blog.Post',
+    'blog.Comment',
+)
+
+
+class Command(BaseCommand):
+    help = ('Dump models as a fixture for `bulkload` or `loaddata`, '
+            'reading them in primary key batches.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', default=DEFAULT_MODELS,
+            help='Models to dump, in dependency order (app_label.Model).'
+        )
+        parser.add_argument(
+            '--output', '-o', help='Output file, stdout by default.'
+        )
+        parser.add_argument(
+            '--jsonl', action='store_true',
+            help='Write one object per line instead of a JSON array.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Number of objects read per query.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database to dump the objects from.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            models = [apps.get_model(label) for label in options['models']]
+        except (LookupError, ValueError) as error:
+            raise CommandError(error)
+        records = (
+            record for model in models
+            for record in iter_model_records(
+                model, options['batch_size'], options['database']
+            )
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                count = dump_records(records, stream, options['jsonl'])
+        else:
+            self.stdout.ending = ''
+            count = dump_records(records, self.stdout, options['jsonl'])
+        self.stderr.write(f'Dumped {count} objects.')
@@ -0,0 +1,71 @@
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from blog.bulk import iter_json_records, load_records, refresh_blog_data
+from blog.models import Comment, Post
+
+
+def open_fixture(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+class Command(BaseCommand):
+    help = ('Load fixtures (a JSON array or JSON lines, optionally '
+            'gzipped) with batched inserts.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixtures', nargs='+', help='Fixture files, "-" for stdin.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of objects per INSERT.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database to load the fixtures into.'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        connection = connections[using]
+        counts = {}
+        # Like loaddata: foreign keys are checked once, after all files,
+        # so objects may refer to ones further down the fixture.
+        with transaction.atomic(using=using):
+            with connection.constraint_checks_disabled():
+                for path in options['fixtures']:
+                    try:
+                        with open_fixture(path) as stream:
+                            loaded = load_records(
+                                iter_json_records(stream),
+                                options['batch_size'], using
+                            )
+                    except (OSError, ValueError) as error:
+                        raise CommandError(f'{path}: {error}')
+                    for model, count in loaded.items():
+                        counts[model] = counts.get(model, 0) + count
+            connection.check_constraints(
+                table_names=[model._meta.db_table for model in counts]
+            )
+            sequence_sql = connection.ops.sequence_reset_sql(
+                no_style(), list(counts)
+            )
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+        if Post in counts or Comment in counts:
+            refresh_blog_data(using)
+        for model, count in counts.items():
+            self.stdout.write(f'{model._meta.label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Installed {sum(counts.values())} objects.'
+        ))
@@ -0,0 +1,109 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.models import Category, Comment, Location, Post
+
+MODELS = {
+    'category': Category,
+    'location': Location,
+    'post': Post,
+    'comment': Comment,
+}
+
+
+def parse_watermark(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        raise CommandError(f'Invalid date and time: {value}')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = ('Export categories, locations, posts and comments as JSON '
+            'lines, optionally only the ones created since the last run.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--models', nargs='+', choices=MODELS, default=list(MODELS),
+            help='Models to export.'
+        )
+        parser.add_argument(
+            '--output', '-o', help='Output file, stdout by default.'
+        )
+        parser.add_argument(
+            '--since', help='Export objects created after this moment.'
+        )
+        parser.add_argument(
+            '--state',
+            help=('JSON file with the watermark of every model: objects '
+                  'created after it are exported and it is moved forward.')
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Number of rows fetched from the database at once.'
+        )
+
+    def handle(self, *args, **options):
+        state = self.read_state(options['state'])
+        since = options['since'] and parse_watermark(options['since'])
+        # Objects created during the export are left for the next run.
+        until = timezone.now()
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                counts = self.export(options, state, since, until, stream)
+        else:
+            self.stdout.ending = ''
+            counts = self.export(options, state, since, until, self.stdout)
+        if options['state']:
+            state.update(dict.fromkeys(counts, until.isoformat()))
+            self.write_state(options['state'], state)
+        self.stderr.write(', '.join(
+            f'{name}: {count}' for name, count in counts.items()
+        ))
+
+    def export(self, options, state, since, until, stream):
+        counts = {}
+        for name in options['models']:
+            model = MODELS[name]
+            lower = since or (name in state and parse_watermark(state[name]))
+            queryset = model.objects.filter(created_at__lte=until)
+            if lower:
+                queryset = queryset.filter(created_at__gt=lower)
+            rows = queryset.order_by('created_at', 'id').values(
+                *(field.attname for field in model._meta.concrete_fields)
+            )
+            counts[name] = 0
+            # values() and iterator() skip model instances and the result
+            # cache, so memory use does not depend on the number of rows.
+            for row in rows.iterator(chunk_size=options['chunk_size']):
+                stream.write(json.dumps(
+                    {'model': name, **row},
+                    cls=DjangoJSONEncoder, ensure_ascii=False
+                ) + '\n')
+                counts[name] += 1
+        return counts
+
+    @staticmethod
+    def read_state(path):
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding='utf-8') as state_file:
+                return json.load(state_file)
+        except ValueError as error:
+            raise CommandError(f'{path}: {error}')
+
+    @staticmethod
+    def write_state(path, state):
+        """Replace the state file atomically, so a crash never breaks it."""
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as state_file:
+            json.dump(state, state_file, indent=2)
+        os.replace(temp_path, path)
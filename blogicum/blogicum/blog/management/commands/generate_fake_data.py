@@ -0,0 +1,138 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.bulk import keep_timestamps, refresh_blog_data
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+WORDS = (
+    'день утро вечер город лес река море дом кот собака дождь солнце '
+    'книга кофе работа прогулка друг поезд дорога парк снег ветер '
+    'новый старый тихий быстрый тёплый холодный весёлый странный '
+    'видеть думать писать читать ждать искать найти вернуться'
+).split()
+PERIOD = timedelta(days=365)
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with random users, posts and comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=20)
+        parser.add_argument(
+            '--password', default='password',
+            help='Password of every generated user.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of objects per INSERT.'
+        )
+        parser.add_argument(
+            '--seed', type=int, help='Seed for a reproducible dataset.'
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        # Numbers make names unique across several runs.
+        start = (User.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        password = make_password(options['password'])
+        self.create(User, (
+            User(username=f'user{start + i}', password=password,
+                 date_joined=self.some_time())
+            for i in range(options['users'])
+        ))
+        self.create(Category, (
+            Category(title=self.sentence(2).capitalize(),
+                     description=self.sentence(12),
+                     slug=f'category-{start}-{i}',
+                     created_at=self.now, updated_at=self.now)
+            for i in range(options['categories'])
+        ))
+        self.create(Location, (
+            Location(name=self.sentence(2).capitalize(),
+                     created_at=self.now, updated_at=self.now)
+            for _ in range(options['locations'])
+        ))
+        user_ids = self.ids(User)
+        category_ids = self.ids(Category) or [None]
+        location_ids = self.ids(Location) + [None]
+        self.create(Post, (
+            self.make_post(user_ids, category_ids, location_ids)
+            for _ in range(options['posts'])
+        ))
+        post_ids = self.ids(Post)
+        if post_ids:
+            self.create(Comment, (
+                self.make_comment(user_ids, post_ids)
+                for _ in range(options['comments'])
+            ))
+        self.stdout.write('Updating comment counters and search index...')
+        refresh_blog_data()
+        self.stdout.write(self.style.SUCCESS('Done.'))
+
+    def create(self, model, objects):
+        batch, created = [], 0
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                created += self.save(model, batch)
+                batch = []
+        created += self.save(model, batch)
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {created}')
+
+    @staticmethod
+    def save(model, batch):
+        # A transaction per batch keeps the database available meanwhile.
+        with transaction.atomic(), keep_timestamps(model):
+            model.objects.bulk_create(batch)
+        return len(batch)
+
+    @staticmethod
+    def ids(model):
+        return list(model.objects.values_list('pk', flat=True))
+
+    def sentence(self, n_words):
+        return ' '.join(self.random.choices(WORDS, k=n_words))
+
+    def some_time(self):
+        """Return a random moment within the last PERIOD."""
+        return self.now - PERIOD * self.random.random()
+
+    def make_post(self, user_ids, category_ids, location_ids):
+        created_at = self.some_time()
+        # About 2% of posts are scheduled and 5% are hidden.
+        pub_date = (self.now + timedelta(days=self.random.randint(1, 30))
+                    if self.random.random() < 0.02 else created_at)
+        return Post(
+            title=self.sentence(4).capitalize(),
+            text=self.sentence(self.random.randint(20, 200)).capitalize(),
+            pub_date=pub_date,
+            author_id=self.random.choice(user_ids),
+            category_id=self.random.choice(category_ids),
+            location_id=self.random.choice(location_ids),
+            is_published=self.random.random() >= 0.05,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+    def make_comment(self, user_ids, post_ids):
+        return Comment(
+            text=self.sentence(self.random.randint(3, 30)).capitalize(),
+            post_id=self.random.choice(post_ids),
+            author_id=self.random.choice(user_ids),
+            created_at=self.some_time(),
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.thumbnails import generate_variants
+
+
+class Command(BaseCommand):
+    help = 'Generate resized variants of post images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Regenerate variants of already processed images too.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            posts = posts.filter(image_width__isnull=True)
+        done = failed = 0
+        for post in posts.iterator():
+            try:
+                generate_variants(post)
+            except OSError as error:
+                failed += 1
+                self.stderr.write(f'Post {post.pk}: {error}')
+            else:
+                done += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Images processed: {done}, failed: {failed}.'
+        ))
@@ -0,0 +1,97 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def fetch(host, port, path, send_delay, timeout):
+    """Make a GET request, return the status code.
+
+    With `send_delay` the client stalls after the request line, like a
+    client on a slow network, keeping the connection busy meanwhile.
+    """
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port), timeout
+    )
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\n'.encode())
+        if send_delay:
+            await writer.drain()
+            await asyncio.sleep(send_delay)
+        writer.write(
+            f'Host: {host}\r\nConnection: close\r\n\r\n'.encode()
+        )
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    return int(response.split(b' ', 2)[1])
+
+
+async def run_load(url, concurrency, n_requests, send_delay, timeout):
+    """Send n_requests with `concurrency` clients; return the results."""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += f'?{parts.query}'
+    latencies, errors = [], 0
+    remaining = n_requests
+
+    async def client():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                status = await fetch(parts.hostname, parts.port or 80, path,
+                                     send_delay, timeout)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                status = None
+            if status is None or status >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+class Command(BaseCommand):
+    help = ('Measure throughput and latency of running servers under many '
+            'concurrent, optionally slow, clients. For example, compare '
+            '`gunicorn blogicum.wsgi` with '
+            '`uvicorn blogicum.asgi:application`.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Pages to load.')
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument(
+            '--send-delay', type=float, default=0,
+            help='Seconds every client takes to send its request.'
+        )
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def handle(self, *args, **options):
+        for url in options['urls']:
+            if urlsplit(url).scheme != 'http':
+                raise CommandError(f'Only http:// URLs are supported: {url}')
+            elapsed, latencies, errors = asyncio.run(run_load(
+                url, options['concurrency'], options['requests'],
+                options['send_delay'], options['timeout']
+            ))
+            line = (f'{url}: {len(latencies) / elapsed:.0f} requests/s, '
+                    f'{errors} errors')
+            if latencies:
+                line += (
+                    f', latency ms p50 {percentile(latencies, 0.5) * 1000:.0f}'
+                    f', p95 {percentile(latencies, 0.95) * 1000:.0f}'
+                    f', max {latencies[-1] * 1000:.0f}'
+                )
+            self.stdout.write(line)
@@ -0,0 +1,121 @@
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+
+from blog.image_queue import (
+    claim_jobs, complete_job, fail_job, queue_stats, requeue_stale_jobs
+)
+from blog.thumbnails import get_widths, render_variants, save_variants
+
+
+def get_source(post):
+    """Return something a pool process can open: a path or the bytes."""
+    try:
+        return post.image.path
+    except NotImplementedError:
+        with post.image.open('rb') as image:
+            return BytesIO(image.read())
+
+
+class Command(BaseCommand):
+    help = 'Process queued post image jobs in a pool of processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Pool size; 0 resizes images in the current process.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=20,
+            help='Number of jobs claimed at once.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='Give up on a job after this many failures.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=5,
+            help='Seconds to wait when the queue is empty.'
+        )
+        parser.add_argument(
+            '--stale-after', type=int, default=10,
+            help='Requeue jobs running for longer than this many minutes.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit as soon as the queue is empty.'
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Print the queue depth and exit.'
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.write_stats()
+            return
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        stale_after = timedelta(minutes=options['stale_after'])
+        executor = (ProcessPoolExecutor(options['workers'])
+                    if options['workers'] else None)
+        try:
+            while True:
+                requeue_stale_jobs(stale_after)
+                jobs = claim_jobs(worker_id, options['batch_size'])
+                if jobs:
+                    self.process(jobs, executor, options['max_attempts'])
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if executor:
+                executor.shutdown()
+        self.write_stats()
+
+    def process(self, jobs, executor, max_attempts):
+        widths = get_widths()
+        futures = {}
+        for job in jobs:
+            if not job.post.image:
+                complete_job(job)
+                continue
+            try:
+                source = get_source(job.post)
+                if executor:
+                    future = executor.submit(render_variants, source, widths)
+                    futures[future] = job
+                else:
+                    self.finish(job, render_variants(source, widths))
+            except Exception as error:
+                self.fail(job, error, max_attempts)
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                self.finish(job, future.result())
+            except Exception as error:
+                self.fail(job, error, max_attempts)
+
+    def finish(self, job, result):
+        save_variants(job.post, *result)
+        complete_job(job)
+        self.stdout.write(f'Post {job.post_id}: image resized.')
+
+    def fail(self, job, error, max_attempts):
+        fail_job(job, error, max_attempts)
+        self.stderr.write(
+            f'Post {job.post_id}: attempt {job.attempts} failed: {error}'
+        )
+
+    def write_stats(self):
+        stats = queue_stats()
+        self.stdout.write(
+            ', '.join(f'{status}: {total}' for status, total in stats.items())
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of posts from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database to rebuild the index in.'
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        backend = get_backend(using)
+        indexed = backend.rebuild(using)
+        self.stdout.write(self.style.SUCCESS(
+            f'{indexed} posts indexed by {type(backend).__name__}.'
+        ))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Post, Comment
+
+
+class Command(BaseCommand):
+    help = 'Recalculate the denormalized Post.comment_count column.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Number of posts (by primary key range) per UPDATE.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database to recalculate the counters in.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size, using = options['batch_size'], options['database']
+        posts = Post.objects.using(using)
+        counts = (Comment.objects.filter(post=OuterRef('pk'))
+                  .order_by().values('post')
+                  .annotate(total=Count('pk')).values('total'))
+        max_pk = posts.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+        updated = 0
+        for start in range(0, max_pk + 1, batch_size):
+            # Short transactions keep the table available for writers.
+            with transaction.atomic(using=using):
+                updated += posts.filter(
+                    pk__gte=start, pk__lt=start + batch_size
+                ).update(comment_count=Coalesce(Subquery(counts), 0))
+        self.stdout.write(self.style.SUCCESS(
+            f'Comment counters recalculated for {updated} posts.'
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.16 on 2026-10-18 13:29
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_count(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    db_alias = schema_editor.connection.alias
+    counts = (Comment.objects.using(db_alias).filter(post=OuterRef('pk'))
+              .order_by().values('post')
+              .annotate(total=Count('pk')).values('total'))
+    Post.objects.using(db_alias).update(
+        comment_count=Coalesce(Subquery(counts), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_auto_20241211_2034'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
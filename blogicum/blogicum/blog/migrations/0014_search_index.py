@@ -0,0 +1,63 @@
+# Generated by Django 3.2.16 on 2026-10-18 13:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+FTS_TABLE = 'blog_post_fts'
+
+
+def has_fts5(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def create_fts_table(apps, schema_editor):
+    """Create and fill the FTS5 index; without FTS5 the pure-Python
+    index is used and is filled by `rebuild_search_index`."""
+    if not has_fts5(schema_editor.connection):
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+        f'USING fts5(title, text)'
+    )
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+        f"SELECT id, replace(replace(title, 'ё', 'е'), 'Ё', 'Е'), "
+        f"replace(replace(text, 'ё', 'е'), 'Ё', 'Е') FROM blog_post"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if has_fts5(schema_editor.connection):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_comment_post_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Слово')),
+                ('weight', models.PositiveIntegerField(verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'слово поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='search_term_post_unique'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 
 User = get_user_model()
@@ -13,11 +14,37 @@ class PublishedModel(models.Model):
     created_at = models.DateTimeField(
         verbose_name='Добавлено', auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Изменено', auto_now=True
+    )
 
     class Meta:
         abstract = True
 
 
+class PostQuerySet(models.QuerySet):
+    """Common filters and joins for post lists."""
+
+    def published(self):
+        """Return posts visible to everyone.
+
+        1. Publication date must be earlier than current;
+        2. Post & category must be published.
+        """
+        return self.filter(
+            is_published=True, category__is_published=True,
+            pub_date__lte=timezone.now()
+        )
+
+    def scheduled(self):
+        """Return published posts with a publication date in the future."""
+        return self.filter(is_published=True, pub_date__gt=timezone.now())
+
+    def with_feed_relations(self):
+        """Join objects rendered on a post card in the same query."""
+        return self.select_related('category', 'location', 'author')
+
+
 class Post(PublishedModel):
     title = models.CharField(verbose_name='Заголовок', max_length=256)
     text = models.TextField(verbose_name='Текст')
@@ -42,11 +69,47 @@ class Post(PublishedModel):
         verbose_name='Изображение', upload_to='post_images/',
         null=True, blank=True
     )
+    image_width = models.PositiveIntegerField(
+        verbose_name='Ширина изображения', null=True, blank=True,
+        editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        verbose_name='Высота изображения', null=True, blank=True,
+        editable=False
+    )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев', default=0, editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = [
+            # Main feed: published posts, newest first.
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            # Category page: published posts of a category, newest first.
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_published_category_idx',
+            ),
+            # Profile page: all posts of an author, newest first.
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx',
+            ),
+            # Incremental export: posts created after a watermark.
+            models.Index(
+                fields=['created_at', 'id'], name='post_created_idx',
+            ),
+        ]
 
 
 class Category(PublishedModel):
@@ -99,6 +162,97 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['created_at']
+        indexes = [
+            # Comments of a post, oldest first (cursor pagination).
+            models.Index(
+                fields=['post', 'created_at', 'id'],
+                name='comment_post_created_idx',
+            ),
+            # Incremental export: comments created after a watermark.
+            models.Index(
+                fields=['created_at', 'id'], name='comment_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'Комментарий к публикации {self.post.title} от {self.author}.'
+
+
+class ImageJob(models.Model):
+    """Resize of a post image, processed by `process_image_jobs`.
+
+    Finished jobs are deleted, failed ones are kept for inspection.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Публикация',
+        related_name='image_jobs',
+        on_delete=models.CASCADE
+    )
+    status = models.CharField(
+        verbose_name='Статус', max_length=16,
+        choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попытки', default=0
+    )
+    error = models.TextField(verbose_name='Ошибка', blank=True)
+    run_after = models.DateTimeField(
+        verbose_name='Не раньше', default=timezone.now
+    )
+    locked_by = models.CharField(
+        verbose_name='Обработчик', max_length=64, blank=True
+    )
+    locked_at = models.DateTimeField(
+        verbose_name='Взято в работу', null=True, blank=True
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Добавлено', auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['status', 'run_after'], name='image_job_queue_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'Обработка изображения публикации {self.post_id}.'
+
+
+class SearchTerm(models.Model):
+    """Posting of the pure-Python search index: a word of a post.
+
+    Used by `blog.search` when SQLite FTS5 is not available.
+    """
+
+    term = models.CharField(verbose_name='Слово', max_length=64)
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Публикация',
+        related_name='search_terms',
+        on_delete=models.CASCADE
+    )
+    weight = models.PositiveIntegerField(verbose_name='Вес')
+
+    class Meta:
+        verbose_name = 'слово поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'post'], name='search_term_post_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.term} ({self.post_id})'
@@ -0,0 +1,178 @@
+import base64
+import binascii
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+class KeysetPage(Sequence):
+    """A single page of a keyset-paginated queryset.
+
+    Unlike `django.core.paginator.Page` it knows nothing about the total
+    number of objects, only whether there are neighbouring pages and the
+    cursors pointing at them.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Paginate a queryset by the (<date field>, id) pair.
+
+    Every page is fetched with `WHERE (date, id) < (cursor)` and `LIMIT`,
+    so deep pages cost the same as the first one and no `COUNT(*)`
+    query is issued.
+
+    The cursor is an opaque url-safe token: `<direction>|<date>|<id>`,
+    where direction `n` means "objects after the key" and `p` means
+    "objects before the key" in the paginator's ordering.
+    """
+
+    def __init__(self, per_page, date_field='pub_date', descending=True):
+        self.per_page = int(per_page)
+        self.date_field = date_field
+        self.descending = descending
+
+    @staticmethod
+    def encode_cursor(direction, obj_date, obj_id):
+        raw = f'{direction}|{obj_date.isoformat()}|{obj_id}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Return (direction, date, id) or raise Http404 on a bad token."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            direction, obj_date, obj_id = raw.split('|')
+            obj_date = parse_datetime(obj_date)
+            obj_id = int(obj_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise Http404('Неверный курсор страницы.')
+        if direction not in ('n', 'p') or obj_date is None:
+            raise Http404('Неверный курсор страницы.')
+        return direction, obj_date, obj_id
+
+    def _ordering(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return f'{prefix}{self.date_field}', f'{prefix}id'
+
+    def _after(self, obj_date, obj_id, reverse=False):
+        """Build a filter selecting objects after the key in the ordering.
+
+        The redundant `date <= key` (`>=` going up) lets the database seek
+        to the key in a (date, id) index instead of scanning up to it.
+        """
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        return Q(**{f'{self.date_field}__{lookup}e': obj_date}) & (
+            Q(**{f'{self.date_field}__{lookup}': obj_date})
+            | Q(**{self.date_field: obj_date, f'id__{lookup}': obj_id})
+        )
+
+    def paginate(self, queryset, cursor=None):
+        """Return a KeysetPage for the given cursor token."""
+        if cursor:
+            direction, obj_date, obj_id = self.decode_cursor(cursor)
+            reverse = direction == 'p'
+            queryset = queryset.filter(
+                self._after(obj_date, obj_id, reverse=reverse)
+            )
+        else:
+            reverse = False
+        # Fetch one extra object to find out if there is one more page.
+        objects = list(
+            queryset.order_by(*self._ordering(reverse))[:self.per_page + 1]
+        )
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if reverse:
+            objects.reverse()
+
+        next_cursor = previous_cursor = None
+        if objects:
+            # Coming back from a later page means there is a next one,
+            # coming forward from an earlier page means there is a previous.
+            if reverse or has_more:
+                next_cursor = self._cursor('n', objects[-1])
+            if (cursor and not reverse) or (reverse and has_more):
+                previous_cursor = self._cursor('p', objects[0])
+        return KeysetPage(objects, self, next_cursor, previous_cursor)
+
+    def _cursor(self, direction, obj):
+        return self.encode_cursor(
+            direction, getattr(obj, self.date_field), obj.pk
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that caches the number of objects.
+
+    The count is stored under `count_key` for `timeout` seconds, so a
+    page view only runs COUNT(*) when the cached count is missing or
+    expired. Counting stops after `limit` objects: bigger results are
+    estimated as "more than `limit`", and only their first `limit`
+    objects are paginated by numbers.
+    """
+
+    def __init__(self, object_list, per_page, count_key, timeout,
+                 limit=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.timeout = timeout
+        self.limit = limit
+
+    @cached_property
+    def total(self) -> int:
+        """Return the cached count, at most `limit` + 1."""
+        total = cache.get(self.count_key)
+        if total is None:
+            total = self.count_objects()
+            cache.set(self.count_key, total, self.timeout)
+        return total
+
+    def count_objects(self) -> int:
+        if self.limit is None:
+            return Paginator.count.func(self)
+        # SELECT COUNT(*) FROM (... LIMIT limit + 1) stops early.
+        return self.object_list[:self.limit + 1].count()
+
+    @cached_property
+    def count(self) -> int:
+        if self.is_approximate:
+            return self.limit
+        return self.total
+
+    @property
+    def is_approximate(self) -> bool:
+        return self.limit is not None and self.total > self.limit
@@ -0,0 +1,199 @@
+"""Full-text search over post titles and texts.
+
+Two interchangeable backends keep a search index that `blog.signals`
+updates on every post save and delete:
+
+* `Fts5Backend` uses the SQLite FTS5 table created by migration 0014
+  and ranks results with bm25();
+* `InvertedIndexBackend` tokenizes posts in Python, stores the postings
+  in `SearchTerm` and ranks results by tf-idf.
+
+SEARCH_BACKEND setting selects 'fts5', 'inverted' or 'auto' (FTS5 when
+its table exists). Both return all query words in any order, so
+`rebuild_search_index` can switch between them at any time.
+"""
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import (
+    Case, Count, ExpressionWrapper, F, FloatField, OuterRef, Subquery, Sum,
+    Value, When
+)
+
+from blog.models import Post, SearchTerm
+
+FTS_TABLE = 'blog_post_fts'
+TITLE_WEIGHT = 5  # A word in the title weighs as much as five in the text.
+MAX_QUERY_TERMS = 10
+MAX_TERM_LENGTH = 64
+POST_COUNT_KEY = 'blog:search:post_count'
+POST_COUNT_TIMEOUT = 60 * 60
+
+WORD_RE = re.compile(r'\w+')
+
+
+def fold(text):
+    """Make 'ё' and 'е' the same letter."""
+    return text.replace('ё', 'е').replace('Ё', 'Е')
+
+
+def tokenize(text):
+    """Split text into lowercase words."""
+    return [word[:MAX_TERM_LENGTH]
+            for word in WORD_RE.findall(fold(text.lower()))]
+
+
+def query_terms(query):
+    """Return unique words of a search query."""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+class Fts5Backend:
+    """Search index in a SQLite FTS5 virtual table, rowid is post id."""
+
+    def index_post(self, post):
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                f'VALUES (%s, %s, %s)',
+                [post.pk, fold(post.title), fold(post.text)]
+            )
+
+    def remove_post(self, post_id):
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+
+    def rebuild(self, using=DEFAULT_DB_ALIAS):
+        """Index all posts in a single statement."""
+        with transaction.atomic(using=using), \
+                connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                f"SELECT id, replace(replace(title, 'ё', 'е'), 'Ё', 'Е'), "
+                f"replace(replace(text, 'ё', 'е'), 'Ё', 'Е') "
+                f'FROM {Post._meta.db_table}'
+            )
+            return cursor.rowcount
+
+    def search(self, queryset, query):
+        """Filter posts by the query and order them by relevance."""
+        terms = query_terms(query)
+        if not terms:
+            return queryset.none()
+        # Quoted words are matched literally and all of them are required.
+        match = ' '.join(f'"{term}"' for term in terms)
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {Post._meta.db_table}.id',
+                   f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'bm25({FTS_TABLE}, %s, 1.0)'},
+            select_params=[TITLE_WEIGHT],
+        ).order_by('search_rank', '-pub_date')
+
+
+class InvertedIndexBackend:
+    """Search index in the `SearchTerm` table, built in Python."""
+
+    @staticmethod
+    def get_terms(post):
+        weights = Counter(tokenize(post.text))
+        for term in tokenize(post.title):
+            weights[term] += TITLE_WEIGHT
+        return [SearchTerm(term=term, post_id=post.pk, weight=weight)
+                for term, weight in weights.items()]
+
+    def index_post(self, post):
+        with transaction.atomic():
+            SearchTerm.objects.filter(post_id=post.pk).delete()
+            SearchTerm.objects.bulk_create(self.get_terms(post))
+
+    def remove_post(self, post_id):
+        SearchTerm.objects.filter(post_id=post_id).delete()
+
+    def rebuild(self, using=DEFAULT_DB_ALIAS, batch_size=1000):
+        """Index all posts, `batch_size` posts per INSERT."""
+        indexed, terms = 0, []
+        search_terms = SearchTerm.objects.using(using)
+        with transaction.atomic(using=using):
+            search_terms.all().delete()
+            posts = Post.objects.using(using).only('title', 'text').order_by()
+            for post in posts.iterator(chunk_size=batch_size):
+                terms.extend(self.get_terms(post))
+                indexed += 1
+                if indexed % batch_size == 0:
+                    search_terms.bulk_create(terms)
+                    terms = []
+            search_terms.bulk_create(terms)
+        cache.delete(POST_COUNT_KEY)
+        return indexed
+
+    def search(self, queryset, query):
+        """Filter posts by the query and order them by relevance."""
+        terms = query_terms(query)
+        if not terms:
+            return queryset.none()
+        postings = SearchTerm.objects.filter(term__in=terms).order_by()
+        doc_freq = dict(
+            postings.values_list('term').annotate(total=Count('pk'))
+        )
+        if len(doc_freq) < len(terms):
+            return queryset.none()
+        # The total only scales idf, so an hour-old value is good enough.
+        n_posts = cache.get_or_set(
+            POST_COUNT_KEY, Post.objects.count, POST_COUNT_TIMEOUT
+        )
+        score = Sum(Case(
+            *(When(term=term, then=ExpressionWrapper(
+                F('weight') * Value(math.log(1 + n_posts / total)),
+                output_field=FloatField()
+            )) for term, total in doc_freq.items()),
+            output_field=FloatField()
+        ))
+        matches = (postings.values('post')
+                   .annotate(n_terms=Count('pk'), score=score)
+                   .filter(n_terms=len(terms)))
+        return queryset.filter(
+            pk__in=matches.values('post')
+        ).annotate(
+            search_rank=Subquery(
+                matches.filter(post=OuterRef('pk')).values('score')
+            )
+        ).order_by('-search_rank', '-pub_date')
+
+
+BACKENDS = {
+    'fts5': Fts5Backend,
+    'inverted': InvertedIndexBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def fts_table_exists(alias):
+    return FTS_TABLE in connections[alias].introspection.table_names()
+
+
+def get_backend(using=DEFAULT_DB_ALIAS):
+    """Return the search backend selected by SEARCH_BACKEND setting.
+
+    With 'auto' the backend depends on the tables of the `using` database.
+    """
+    name = getattr(settings, 'SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        name = 'fts5' if fts_table_exists(using) else 'inverted'
+    return BACKENDS[name]()
+
+
+def search_posts(queryset, query):
+    return get_backend().search(queryset, query)
@@ -0,0 +1,175 @@
+from contextvars import ContextVar
+
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.dispatch import receiver
+
+from blog.caching import (
+    FEED_POST_COUNT, adjust_post_count, get_exact_post_count,
+    invalidate_feeds, invalidate_next_visibility_change,
+    invalidate_post_counts
+)
+from blog.image_queue import enqueue_image_job
+from blog.models import Category, Comment, Location, Post
+from blog.search import get_backend
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_feed_cache(sender, **kwargs):
+    """Drop cached feed pages when anything shown on them changes."""
+    invalidate_feeds()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_scheduled_posts(sender, **kwargs):
+    """Recalculate the next scheduled publication on the next request."""
+    invalidate_next_visibility_change()
+
+
+def is_visible(post_id) -> bool:
+    return Post.objects.published().filter(pk=post_id).exists()
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_visibility(sender, instance, **kwargs):
+    """Note if the post was in the feed while its count is cached."""
+    instance._was_visible = (
+        instance.pk is not None
+        and get_exact_post_count(FEED_POST_COUNT) is not None
+        and is_visible(instance.pk)
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def update_feed_post_count(sender, instance, signal, **kwargs):
+    """Keep the cached number of published posts up to date.
+
+    The count is adjusted when the transaction is not committed yet, so
+    a rollback leaves it wrong until it expires.
+    """
+    if get_exact_post_count(FEED_POST_COUNT) is None:
+        return
+    is_visible_now = signal is post_save and is_visible(instance.pk)
+    adjust_post_count(
+        FEED_POST_COUNT,
+        is_visible_now - getattr(instance, '_was_visible', False)
+    )
+
+
+# Posts being deleted: their comments go with them, uncounted.
+_deleted_posts = ContextVar('deleted_posts', default=frozenset())
+
+
+def add_comments(post_id, number, using) -> None:
+    Post.objects.using(using).filter(pk=post_id).update(
+        comment_count=Greatest(F('comment_count') + number, 0)
+    )
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw=False, using=None,
+                          **kwargs):
+    """Note the post of an edited comment, which may be moved to another."""
+    instance._previous_post_id = None if raw or instance.pk is None else (
+        Comment.objects.using(using).filter(pk=instance.pk)
+        .values_list('post_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw=False, using=None,
+                        **kwargs):
+    """Keep Post.comment_count up to date, whoever saves the comment."""
+    if raw:
+        return
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if created:
+        add_comments(instance.post_id, 1, using)
+    elif previous_post_id not in (None, instance.post_id):
+        add_comments(previous_post_id, -1, using)
+        add_comments(instance.post_id, 1, using)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, **kwargs):
+    _deleted_posts.set(_deleted_posts.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance, **kwargs):
+    _deleted_posts.set(_deleted_posts.get() - {instance.pk})
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, using=None, **kwargs):
+    if instance.post_id not in _deleted_posts.get():
+        add_comments(instance.post_id, -1, using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_post_counts(sender, **kwargs):
+    """Recount posts when a category is hidden, shown or deleted."""
+    invalidate_post_counts()
+
+
+@receiver(pre_save, sender=Post)
+def reset_image_size(sender, instance, raw=False, update_fields=None,
+                     **kwargs):
+    """Forget the size of a replaced image in the same save.
+
+    Without the size the original image is served until the image job
+    generates the variants of the new one.
+    """
+    instance._image_changed = False
+    if raw or (update_fields and 'image' not in update_fields):
+        return
+    old_image = (sender.objects.filter(pk=instance.pk)
+                 .values_list('image', flat=True).first()
+                 if instance.pk is not None else None)
+    if (old_image or '') == (instance.image.name or ''):
+        return
+    instance._image_changed = True
+    instance.image_width = instance.image_height = None
+
+
+@receiver(post_save, sender=Post)
+def queue_image_job(sender, instance, update_fields=None, **kwargs):
+    """Queue resizing of a new image, whoever saved the post."""
+    if not getattr(instance, '_image_changed', False):
+        return
+    if update_fields and not {'image_width', 'image_height'} <= set(
+            update_fields
+    ):
+        # save(update_fields=['image']) has not saved the reset size.
+        sender.objects.filter(pk=instance.pk).update(
+            image_width=None, image_height=None
+        )
+    if instance.image:
+        enqueue_image_job(instance)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    """Keep the search index in sync with post titles and texts."""
+    if update_fields and not {'title', 'text'} & set(update_fields):
+        return
+    get_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_index(sender, instance, **kwargs):
+    get_backend().remove_post(instance.pk)
@@ -0,0 +1,23 @@
+from django import template
+
+from blog.thumbnails import get_srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_srcset(post):
+    """Return the `srcset` attribute value for the post image."""
+    srcset = get_srcset(post)
+    if len(srcset) < 2:
+        return ''
+    return ', '.join(f'{url} {width}w' for url, width in srcset)
+
+
+@register.simple_tag
+def image_src(post, width):
+    """Return the URL of the smallest image variant at least `width` wide."""
+    for url, variant_width in get_srcset(post):
+        if variant_width is None or variant_width >= width:
+            return url
+    return post.image.url
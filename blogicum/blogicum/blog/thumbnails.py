@@ -0,0 +1,91 @@
+"""Resized variants of post images for `srcset`.
+
+Variants are JPEG files stored next to the originals, in
+`post_images/thumbs/`, one per width from POST_IMAGE_WIDTHS that is
+smaller than the original image.
+"""
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+THUMBNAILS_DIR = 'thumbs'
+JPEG_QUALITY = 85
+
+
+def get_widths():
+    return sorted(getattr(settings, 'POST_IMAGE_WIDTHS', (320, 640, 1280)))
+
+
+def variant_name(name, width):
+    """Return the storage name of the image variant of the given width."""
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, THUMBNAILS_DIR, f'{stem}_{width}w.jpg')
+
+
+def render_variants(source, widths):
+    """Resize an image file to every width smaller than the original.
+
+    Return the original (width, height) and a {width: JPEG bytes} dict.
+    Works on plain files and paths, so it can run outside of Django.
+    """
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode != 'RGB':
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        size = image.size
+        variants = {}
+        for width in widths:
+            if width >= image.width:
+                break
+            height = round(image.height * width / image.width)
+            buffer = BytesIO()
+            image.resize((width, height), Image.LANCZOS).save(
+                buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True
+            )
+            variants[width] = buffer.getvalue()
+    return size, variants
+
+
+def save_variants(post, size, variants):
+    """Store rendered variants and remember the original image size."""
+    storage = post.image.storage
+    for width, content in variants.items():
+        name = variant_name(post.image.name, width)
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(content))
+    post.image_width, post.image_height = size
+    # Saving updated_at also refreshes cached cards with the new srcset.
+    post.save(update_fields=['image_width', 'image_height', 'updated_at'])
+
+
+def generate_variants(post):
+    """Create all resized variants of the post image."""
+    with post.image.open('rb') as source:
+        size, variants = render_variants(source, get_widths())
+    save_variants(post, size, variants)
+
+
+def get_srcset(post):
+    """Return (url, width) pairs of the post image, smallest first.
+
+    Only the original is returned while the variants are not generated.
+    """
+    if not post.image:
+        return []
+    if not post.image_width:
+        return [(post.image.url, None)]
+    storage = post.image.storage
+    srcset = [
+        (storage.url(variant_name(post.image.name, width)), width)
+        for width in get_widths() if width < post.image_width
+    ]
+    srcset.append((post.image.url, post.image_width))
+    return srcset
@@ -6,14 +6,26 @@ from . import views
 
 app_name = 'blog'
 
+# ASGI servers get async variants of the read-only views.
+if settings.ASYNC_VIEWS:
+    index_view = views.AsyncPostIndexListView.as_view()
+    category_view = views.AsyncPostCategoryListView.as_view()
+    post_detail_view = views.AsyncPostDetailView.as_view()
+    profile_view = views.AsyncProfileListView.as_view()
+else:
+    index_view = views.PostIndexListView.as_view()
+    category_view = views.PostCategoryListView.as_view()
+    post_detail_view = views.PostDetailView.as_view()
+    profile_view = views.ProfileListView.as_view()
+
 urlpatterns = [
     # View posts.
-    path('',
-         views.PostIndexListView.as_view(), name='index'),
+    path('', index_view, name='index'),
     path('category/<slug:category_slug>/',
-         views.PostCategoryListView.as_view(), name='category_posts'),
-    path('posts/<int:post_id>/',
-         views.PostDetailView.as_view(), name='post_detail'),
+         category_view, name='category_posts'),
+    path('search/',
+         views.PostSearchListView.as_view(), name='search'),
+    path('posts/<int:post_id>/', post_detail_view, name='post_detail'),
 
     # Edit posts.
     path('posts/create/',
@@ -24,12 +36,13 @@ urlpatterns = [
          views.PostDeleteView.as_view(), name='delete_post'),
 
     # Profile.
-    path('profile/<str:username>/',
-         views.ProfileListView.as_view(), name='profile'),
+    path('profile/<str:username>/', profile_view, name='profile'),
     path('edit_profile/',
          views.ProfileUpdateView.as_view(), name='edit_profile'),
 
     # Comments.
+    path('posts/<int:post_id>/comments/',
+         views.PostCommentListView.as_view(), name='post_comments'),
     path('posts/<int:post_id>/comment/',
          views.CommentCreateView.as_view(), name='add_comment'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
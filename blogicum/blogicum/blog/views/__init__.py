@@ -1,6 +1,7 @@
 from .posts import (
-    PostIndexListView, PostCategoryListView, PostDetailView,
-    PostCreateView, PostUpdateView, PostDeleteView
+    PostIndexListView, PostCategoryListView, PostSearchListView,
+    PostDetailView, PostCommentListView, PostCreateView, PostUpdateView,
+    PostDeleteView
 )
 from .profiles import (
     ProfileListView, ProfileUpdateView
@@ -8,13 +9,21 @@ from .profiles import (
 from .comments import (
     CommentCreateView, CommentUpdateView, CommentDeleteView
 )
+from .async_views import (
+    AsyncPostIndexListView, AsyncPostCategoryListView, AsyncPostDetailView,
+    AsyncProfileListView
+)
 
 
 __all__ = [
-    PostIndexListView, PostCategoryListView, PostDetailView,
-    PostCreateView, PostUpdateView, PostDeleteView,
+    PostIndexListView, PostCategoryListView, PostSearchListView,
+    PostDetailView, PostCommentListView, PostCreateView, PostUpdateView,
+    PostDeleteView,
 
     ProfileListView, ProfileUpdateView,
 
-    CommentCreateView, CommentUpdateView, CommentDeleteView
+    CommentCreateView, CommentUpdateView, CommentDeleteView,
+
+    AsyncPostIndexListView, AsyncPostCategoryListView, AsyncPostDetailView,
+    AsyncProfileListView
 ]
@@ -0,0 +1,240 @@
+"""Async variants of the read-only views for ASGI servers.
+
+They are routed instead of the sync views when the ASYNC_VIEWS setting is
+on, as `blogicum/asgi.py` does. A sync view occupies a worker thread for
+the whole request; an async one gives the event loop back while it waits,
+so a single worker serves many slow connections.
+
+Django 3.2 has no async ORM: the database work of a view runs in a
+worker thread with its own connection, so requests don't queue for the
+single thread of sync_to_async(), and the template is rendered in a
+thread by Django itself. Independent queries of category and profile
+pages run concurrently. `python manage.py loadtest` compares both paths.
+"""
+import asyncio
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Page
+from django.db import close_old_connections, connection
+from django.http import Http404
+from django.utils.decorators import classonlymethod
+
+from blog.caching import feed_page_key
+from blog.views.posts import (
+    PostCategoryListView, PostDetailView, PostIndexListView
+)
+from blog.views.profiles import ProfileListView
+
+
+def load_user(request):
+    """Fetch the lazy `request.user`, so it can be used in the event loop."""
+    return request.user.is_authenticated
+
+
+def in_transaction():
+    """Tell if the connection of the current thread is in a transaction."""
+    return connection.in_atomic_block
+
+
+def in_own_thread(func):
+    """Wrap func to run in a worker thread with its own DB connection.
+
+    Connections of worker threads are not closed at the end of requests,
+    so they are checked against CONN_MAX_AGE after every call.
+    """
+    def run(*args):
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)
+
+
+class AsyncViewMixin:
+    """Serve a read-only class-based view with an `async def get()`.
+
+    as_view() returns a coroutine function, so Django awaits the view
+    instead of running it in a thread, like Django 4.1 does.
+    """
+
+    http_method_names = ['get', 'head']
+    # Whether database work may run in threads with their own connections.
+    own_threads = True
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):  # noqa: N805
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+            return response
+
+        # Keeps `view_class`, which the replica router looks at.
+        update_wrapper(async_view, view)
+        return async_view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() not in self.http_method_names:
+            return self.http_method_not_allowed(request, *args, **kwargs)
+        # Other connections don't see the changes of a transaction (open in
+        # tests: ATOMIC_REQUESTS does not apply to async views).
+        self.own_threads = not await sync_to_async(in_transaction)()
+        await self.in_thread(load_user)(request)
+        return await self.get(request, *args, **kwargs)
+
+    def in_thread(self, func):
+        """Wrap func to run in a worker thread, see in_own_thread().
+
+        sync_to_async() would run the database work of all requests in
+        one shared thread, one request at a time.
+        """
+        if self.own_threads:
+            return in_own_thread(func)
+        return sync_to_async(func)
+
+
+class AsyncListMixin(AsyncViewMixin):
+    """Async ListView.get()."""
+
+    async def get(self, request, *args, **kwargs):
+        context = await self.in_thread(self.get_list_context)()
+        return self.render_to_response(context)
+
+    def get_list_context(self) -> dict:
+        self.object_list = self.get_queryset()
+        context = self.get_context_data()
+        # Fetch the page here rather than while rendering.
+        page = context['page_obj']
+        if page is not None:
+            page.object_list = context['object_list'] = list(
+                page.object_list
+            )
+        return context
+
+
+class AsyncConcurrentListMixin(AsyncListMixin):
+    """Fetch the owner of the list and the page of posts concurrently.
+
+    The owner (a category or a profile) comes with the number of posts,
+    so the paginator needs no COUNT(*) query, while the posts are
+    selected by the owner's URL kwarg instead of its id. Pages given by
+    a cursor or a non-numeric page number are fetched one by one, and so
+    are pages inside a transaction.
+    """
+
+    owner_lookup = None
+    _page = None
+
+    def get_owner(self):
+        raise NotImplementedError
+
+    def get_page_number(self):
+        if self.is_cursor_paginated():
+            return None
+        value = (self.kwargs.get(self.page_kwarg)
+                 or self.request.GET.get(self.page_kwarg) or 1)
+        try:
+            number = int(value)
+        except ValueError:
+            return None
+        return number if number >= 1 else None
+
+    def get_page_posts(self, number):
+        posts = self.get_posts(
+            **{self.owner_lookup: self.kwargs[self.slug_url_kwarg]}
+        )
+        offset = (number - 1) * self.paginate_by
+        return list(posts[offset:offset + self.paginate_by])
+
+    async def get(self, request, *args, **kwargs):
+        number = self.get_page_number()
+        if number is None or not self.own_threads:
+            return await super().get(request, *args, **kwargs)
+        _, posts = await asyncio.gather(
+            in_own_thread(self.get_owner)(),
+            in_own_thread(self.get_page_posts)(number),
+        )
+        context = await self.in_thread(self.get_page_context)(number, posts)
+        return self.render_to_response(context)
+
+    def get_page_context(self, number, posts) -> dict:
+        paginator = self.get_paginator(self.get_queryset(), self.paginate_by)
+        try:
+            paginator.validate_number(number)
+        except InvalidPage as error:
+            raise Http404(str(error))
+        self._page = Page(posts, number, paginator)
+        return self.get_list_context()
+
+    def paginate_queryset(self, queryset, page_size):
+        if self._page is None:
+            return super().paginate_queryset(queryset, page_size)
+        page = self._page
+        return page.paginator, page, page.object_list, page.has_other_pages()
+
+
+class AsyncDetailMixin(AsyncViewMixin):
+    """Async DetailView.get()."""
+
+    async def get(self, request, *args, **kwargs):
+        context = await self.in_thread(self.get_detail_context)()
+        return self.render_to_response(context)
+
+    def get_detail_context(self) -> dict:
+        self.object = self.get_object()
+        return self.get_context_data(object=self.object)
+
+
+class AsyncPageCacheMixin:
+    """Async AnonymousPageCacheMixin.dispatch()."""
+
+    async def get(self, request, *args, **kwargs):
+        if not self.is_page_cacheable(request):
+            return await super().get(request, *args, **kwargs)
+        key, response = await self.in_thread(self.get_cached_page)(request)
+        if response is None:
+            response = await super().get(request, *args, **kwargs)
+            if response.status_code == 200:
+                timeout = await self.in_thread(self.get_page_cache_timeout)()
+                self.cache_on_render(key, response, timeout)
+        return response
+
+    @staticmethod
+    def get_cached_page(request):
+        key = feed_page_key(request)
+        return key, cache.get(key)
+
+
+class AsyncPostIndexListView(AsyncPageCacheMixin, AsyncListMixin,
+                             PostIndexListView):
+    """Async PostIndexListView."""
+
+
+class AsyncPostCategoryListView(AsyncPageCacheMixin, AsyncConcurrentListMixin,
+                                PostCategoryListView):
+    """Async PostCategoryListView."""
+
+    owner_lookup = 'category__slug'
+    slug_url_kwarg = 'category_slug'
+
+    def get_owner(self):
+        return self.get_category()
+
+
+class AsyncPostDetailView(AsyncDetailMixin, PostDetailView):
+    """Async PostDetailView."""
+
+
+class AsyncProfileListView(AsyncConcurrentListMixin, ProfileListView):
+    """Async ProfileListView."""
+
+    owner_lookup = 'author__username'
+    slug_url_kwarg = 'username'
+
+    def get_owner(self):
+        return self.get_profile()
@@ -1,5 +1,4 @@
-from django.shortcuts import get_object_or_404, redirect
-from django.utils import timezone
+from django.shortcuts import get_object_or_404
 from django.urls import reverse
 
 from django.views.generic import CreateView, UpdateView, DeleteView, View
@@ -7,6 +6,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 
 from blog.models import Post, Comment
 from blog.forms import CommentForm
+from blog.views.posts import AuthorRequiredMixin
 
 
 class CommentMixin(LoginRequiredMixin):
@@ -25,10 +25,7 @@ class CommentCreateView(CommentMixin, CreateView):
     def dispatch(self, request, *args, **kwargs):
         """Get post object or 404."""
         self._post = get_object_or_404(
-            Post, pk=kwargs['post_id'],
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True
+            Post.objects.published(), pk=kwargs['post_id']
         )
         return super().dispatch(request, *args, **kwargs)
 
@@ -43,18 +40,11 @@ class CommentCreateView(CommentMixin, CreateView):
         return reverse('blog:post_detail', kwargs={'post_id': self._post.pk})
 
 
-class CommentUpdDelMixin(CommentMixin, View):
+class CommentUpdDelMixin(AuthorRequiredMixin, CommentMixin, View):
     """Mixin for comment update and delete views."""
 
     pk_url_kwarg = 'comment_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        """Check if the current user is the author of the comment."""
-        comment = get_object_or_404(Comment, pk=kwargs['comment_id'])
-        if comment.author != request.user:
-            return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
-        return super().dispatch(request, *args, **kwargs)
-
     def get_success_url(self):
         return reverse("blog:post_detail",
                        kwargs={'post_id': self.kwargs['post_id']})
@@ -1,4 +1,10 @@
-from django.db.models import Count
+import hashlib
+from typing import Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
@@ -8,10 +14,50 @@ from django.views.generic import (
 )
 from django.contrib.auth.mixins import LoginRequiredMixin
 
+from blog.caching import (
+    FEED_POST_COUNT, cap_timeout, feed_page_key, get_next_visibility_change,
+    get_post_count_limit, get_post_count_timeout, post_count_key,
+    seconds_until
+)
 from blog.models import Post, Category
 from blog.forms import PostForm, CommentForm
+from blog.paginators import CachedCountPaginator, KeysetPaginator
+from blog.search import search_posts
 
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+
+
+def get_visible_post(user, post_id, queryset) -> Post:
+    """Return Post or Http404 by post ID.
+
+    1. The author can see all of their posts;
+    2. Others can see a post only if it is published, its category is
+       published and its publication date is earlier than current.
+    """
+    post = get_object_or_404(queryset, pk=post_id)
+
+    # Allow access: user is the author.
+    if post.author_id == user.pk:
+        return post
+
+    # Deny access: user is not the author, post isn't published.
+    is_denied = (not post.is_published
+                 or post.pub_date > timezone.now()
+                 or not post.category.is_published)
+    if is_denied:
+        raise Http404
+
+    # Allow access: user is not the author, post is published.
+    return post
+
+
+def paginate_comments(post, cursor=None):
+    """Return a page of post comments, oldest first."""
+    paginator = KeysetPaginator(
+        COMMENTS_PER_PAGE, date_field='created_at', descending=False
+    )
+    return paginator.paginate(post.comment.select_related('author'), cursor)
 
 
 class PostMixin:
@@ -20,13 +66,126 @@ class PostMixin:
     model = Post
 
 
+class PostListMixin(PostMixin):
+    """Paginate post lists by page numbers or by (pub_date, id) cursor.
+
+    Cursor (keyset) pagination is used when POSTS_PAGINATION setting is
+    'cursor' or the request has a `cursor` query parameter: it skips the
+    COUNT(*) query and keeps deep pages as cheap as the first one.
+
+    Page numbers need the number of posts: views either know it without
+    a query (get_post_count) or cache it by a name (get_count_name).
+    """
+
+    paginate_by = POSTS_PER_PAGE
+    cursor_kwarg = 'cursor'
+    read_from_replica = True
+
+    def is_cursor_paginated(self) -> bool:
+        return (self.cursor_kwarg in self.request.GET
+                or getattr(settings, 'POSTS_PAGINATION', None) == 'cursor')
+
+    def get_post_count(self) -> Optional[int]:
+        """Return the number of posts if it is known without a query."""
+        return None
+
+    def get_count_name(self) -> Optional[str]:
+        """Return the name to cache the number of posts under."""
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        count_name = self.get_count_name()
+        if count_name is not None:
+            return CachedCountPaginator(
+                queryset, per_page, post_count_key(count_name),
+                get_post_count_timeout(), get_post_count_limit(), **kwargs
+            )
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        count = self.get_post_count()
+        if count is not None:
+            # Paginator.count is a cached property: no COUNT(*) query.
+            paginator.count = count
+        return paginator
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.is_cursor_paginated():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(page_size)
+        page = paginator.paginate(
+            queryset, self.request.GET.get(self.cursor_kwarg)
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AnonymousPageCacheMixin:
+    """Serve whole pages to anonymous visitors from the cache.
+
+    Cached pages are dropped by `blog.signals` when posts, comments,
+    categories or locations change, and expire when the next scheduled
+    post is published or after FEED_CACHE_TIMEOUT, whichever is earlier.
+    """
+
+    def get_page_cache_timeout(self) -> int:
+        timeout = getattr(settings, 'FEED_CACHE_TIMEOUT', 60 * 60)
+        next_change = get_next_visibility_change()
+        if next_change is not None:
+            timeout = min(timeout, seconds_until(next_change))
+        return cap_timeout(timeout)
+
+    @staticmethod
+    def is_page_cacheable(request) -> bool:
+        return request.method == 'GET' and not request.user.is_authenticated
+
+    @staticmethod
+    def cache_on_render(key, response, timeout):
+        """Cache the response once it is rendered."""
+        response.add_post_render_callback(
+            lambda rendered: cache.set(key, rendered, timeout)
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_page_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+        key = feed_page_key(request)
+        response = cache.get(key)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code == 200:
+                self.cache_on_render(
+                    key, response, self.get_page_cache_timeout()
+                )
+        return response
+
+
+class AuthorRequiredMixin:
+    """Let only the author of the object edit or delete it.
+
+    The object is fetched once in dispatch() and reused by the generic
+    view; authorship is checked by `author_id`, without loading the user.
+    Others are redirected to the post detail page (blog:post_detail).
+    """
+
+    _object = None
+
+    def get_object(self, queryset=None):
+        if self._object is None:
+            self._object = super().get_object(queryset)
+        return self._object
+
+    def dispatch(self, request, *args, **kwargs):
+        """Check if the current user is the author of the object."""
+        if self.get_object().author_id != request.user.pk:
+            return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
+        return super().dispatch(request, *args, **kwargs)
+
+
 class PostEditMixin(PostMixin):
     """Set default template for post-edit views."""
 
     template_name = 'blog/create.html'
 
 
-class PostIndexListView(PostMixin, ListView):
+class PostIndexListView(AnonymousPageCacheMixin, PostListMixin, ListView):
     """Show latest POSTS_PER_PAGE posts.
 
     1. Publication date must be earlier than current;
@@ -34,18 +193,17 @@ class PostIndexListView(PostMixin, ListView):
     """
 
     template_name = 'blog/index.html'
-    paginate_by = POSTS_PER_PAGE
+
+    def get_count_name(self) -> str:
+        return FEED_POST_COUNT
 
     def get_queryset(self):
-        return self.model.objects.filter(
-            category__is_published__exact=True, is_published__exact=True,
-            pub_date__lte=timezone.now()
-        ).order_by(
-            '-pub_date'
-        ).annotate(comment_count=Count("comment"))
+        return (self.model.objects.published().with_feed_relations()
+                .order_by('-pub_date'))
 
 
-class PostCategoryListView(PostMixin, ListView):
+class PostCategoryListView(AnonymousPageCacheMixin, PostListMixin,
+                           ListView):
     """Show latest POSTS_PER_PAGE posts in category.
 
     1. Publication date must be earlier than current;
@@ -54,26 +212,32 @@ class PostCategoryListView(PostMixin, ListView):
     """
 
     template_name = 'blog/category.html'
-    paginate_by = POSTS_PER_PAGE
     _category = None
 
     def get_category(self) -> Category:
-        """Fetch and cache the category object."""
+        """Fetch and cache the category with the number of its posts."""
         if not self._category:
+            categories = Category.objects.filter(is_published=True)
+            if not self.is_cursor_paginated():
+                categories = categories.annotate(post_count=Count(
+                    'post', filter=Q(post__is_published=True,
+                                     post__pub_date__lte=timezone.now())
+                ))
             self._category = get_object_or_404(
-                Category,
-                slug=self.kwargs['category_slug'],
-                is_published=True
+                categories, slug=self.kwargs['category_slug']
             )
         return self._category
 
+    def get_post_count(self) -> Optional[int]:
+        return getattr(self.get_category(), 'post_count', None)
+
+    def get_posts(self, **filters):
+        return (self.model.objects.published().with_feed_relations()
+                .filter(**filters).order_by('-pub_date'))
+
     def get_queryset(self, **kwargs):
         """Return posts for <category_slug> category."""
-        category = self.get_category()
-        return self.model.objects.filter(
-            category__exact=category,
-            is_published__exact=True, pub_date__lte=timezone.now()
-        ).order_by('-pub_date').annotate(comment_count=Count("comment"))
+        return self.get_posts(category=self.get_category())
 
     def get_context_data(self, **kwargs):
         """Add category to the context."""
@@ -82,6 +246,43 @@ class PostCategoryListView(PostMixin, ListView):
         return context
 
 
+class PostSearchListView(PostListMixin, ListView):
+    """Show published posts matching the `q` query, most relevant first.
+
+    Results are ordered by relevance, so they are always paginated by
+    page numbers.
+    """
+
+    template_name = 'blog/search.html'
+    query_kwarg = 'q'
+
+    def get_query(self) -> str:
+        return self.request.GET.get(self.query_kwarg, '').strip()
+
+    def is_cursor_paginated(self) -> bool:
+        return False
+
+    def get_count_name(self) -> Optional[str]:
+        query = self.get_query()
+        if not query:
+            return None
+        return f'search:{hashlib.md5(query.encode()).hexdigest()}'
+
+    def get_queryset(self):
+        queryset = self.model.objects.published().with_feed_relations()
+        query = self.get_query()
+        if not query:
+            return queryset.none()
+        return search_posts(queryset, query)
+
+    def get_context_data(self, **kwargs):
+        """Add the query to the context and to the paginator links."""
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_query()
+        context['page_query'] = urlencode({self.query_kwarg: context['query']})
+        return context
+
+
 class PostDetailView(PostMixin, DetailView):
     """Show a single post by ID.
 
@@ -90,40 +291,54 @@ class PostDetailView(PostMixin, DetailView):
     """
 
     template_name = 'blog/detail.html'
+    read_from_replica = True
 
     def get_object(self, **kwargs):
         """Return Post or Http404 by post ID."""
-        post = get_object_or_404(
-            self.model.objects.filter(pk=self.kwargs['post_id'])
+        return get_visible_post(
+            self.request.user, self.kwargs['post_id'],
+            self.model.objects.with_feed_relations()
         )
 
-        # Allow access: user is the author.
-        if post.author == self.request.user:
-            return post
+    def get_context_data(self, **kwargs):
+        """Add form and the first page of comments to the context."""
+        context = super().get_context_data(**kwargs)
+        context['form'] = CommentForm()
+        context['comments'] = paginate_comments(self.object)
+        return context
 
-        # Deny access: user is not the author, post isn't published.
-        is_denied = (not post.is_published
-                     or post.pub_date > timezone.now()
-                     or not post.category.is_published)
-        if is_denied:
-            raise Http404
 
-        # Allow access: user is not the author, post is published.
-        return post
+class PostCommentListView(PostMixin, DetailView):
+    """Render the next page of post comments as an HTML fragment."""
+
+    template_name = 'includes/comment_list.html'
+    read_from_replica = True
+
+    def get_object(self, **kwargs):
+        """Return Post or Http404 by post ID."""
+        return get_visible_post(
+            self.request.user, self.kwargs['post_id'],
+            self.model.objects.select_related('category')
+        )
 
     def get_context_data(self, **kwargs):
-        """Add form and comments to the context."""
+        """Add the requested page of comments to the context."""
         context = super().get_context_data(**kwargs)
-        context['form'] = CommentForm()
-        context['comments'] = self.object.comment.select_related('author')
+        context['comments'] = paginate_comments(
+            self.object, self.request.GET.get('cursor')
+        )
         return context
 
 
-class PostCreateView(PostEditMixin, LoginRequiredMixin, CreateView):
-    """Create a new post."""
+class PostFormMixin(PostEditMixin):
+    """Set default form for post create/update views."""
 
     form_class = PostForm
 
+
+class PostCreateView(PostFormMixin, LoginRequiredMixin, CreateView):
+    """Create a new post."""
+
     def form_valid(self, form):
         """Save model instance."""
         form.instance.author = self.request.user
@@ -134,18 +349,12 @@ class PostCreateView(PostEditMixin, LoginRequiredMixin, CreateView):
         return reverse("blog:profile", args=[self.request.user])
 
 
-class PostUpdateView(PostEditMixin, LoginRequiredMixin, UpdateView):
+class PostUpdateView(AuthorRequiredMixin, PostFormMixin, LoginRequiredMixin,
+                     UpdateView):
     """Edit an existing post."""
 
-    form_class = PostForm
     pk_url_kwarg = 'post_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        """Check if the current user is the author of the post."""
-        if self.get_object().author != request.user:
-            return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
-        return super().dispatch(request, *args, **kwargs)
-
     def get_success_url(self):
         """Redirect to post detail page (blog:post_detail)."""
         return reverse(
@@ -153,17 +362,12 @@ class PostUpdateView(PostEditMixin, LoginRequiredMixin, UpdateView):
         )
 
 
-class PostDeleteView(PostEditMixin, LoginRequiredMixin, DeleteView):
+class PostDeleteView(AuthorRequiredMixin, PostEditMixin, LoginRequiredMixin,
+                     DeleteView):
     """Delete an existing post."""
 
     pk_url_kwarg = 'post_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        """Check if the current user is the author of the post."""
-        if self.get_object().author != request.user:
-            return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
-        return super().dispatch(request, *args, **kwargs)
-
     def get_context_data(self, **kwargs):
         """Add form to the context."""
         context = super().get_context_data(**kwargs)
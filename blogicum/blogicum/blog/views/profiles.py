@@ -1,4 +1,6 @@
-from django.db.models import Count
+from typing import Optional
+
+from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.contrib.auth import get_user_model
@@ -7,39 +9,62 @@ from django.urls import reverse
 from django.views.generic import ListView, UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 
-from blog.models import Post
-from blog.views.posts import POSTS_PER_PAGE
+from blog.views.posts import PostListMixin
 from blog.forms import ProfileEditForm
 
 User = get_user_model()
 
 
-class ProfileListView(ListView):
+class ProfileListView(PostListMixin, ListView):
     """Show user's page with posts."""
 
-    model = Post
-    paginate_by = POSTS_PER_PAGE  # Defined in 'blog/views/posts.py'
     template_name = 'blog/profile.html'
+    _profile = None
+    _visibility_filters = None
+
+    def get_visibility_filters(self) -> dict:
+        """Return filters of the posts the current user can see."""
+        if self._visibility_filters is None:
+            self._visibility_filters = {}
+            if self.request.user.username != self.kwargs['username']:
+                # Hide unpublished posts for other users.
+                self._visibility_filters = {
+                    'is_published': True,
+                    'pub_date__lte': timezone.now()
+                }
+        return self._visibility_filters
+
+    def get_profile(self):
+        """Fetch and cache the user with the number of visible posts."""
+        if self._profile is None:
+            users = User.objects.all()
+            if not self.is_cursor_paginated():
+                filters = {f'post__{lookup}': value for lookup, value
+                           in self.get_visibility_filters().items()}
+                users = users.annotate(post_count=Count(
+                    'post', filter=Q(**filters) if filters else None
+                ))
+            self._profile = get_object_or_404(
+                users, username=self.kwargs['username']
+            )
+        return self._profile
+
+    def get_post_count(self) -> Optional[int]:
+        return getattr(self.get_profile(), 'post_count', None)
+
+    def get_posts(self, **filters):
+        return (self.model.objects.with_feed_relations()
+                .filter(**self.get_visibility_filters(), **filters)
+                .order_by('-pub_date'))
 
     def get_queryset(self):
         """Return posts for <username> author."""
-        filters = {'author__username': self.kwargs['username']}
-        if self.request.user.username != self.kwargs['username']:
-            # Hide unpublished posts for other users.
-            filters.update({
-                'is_published__exact': True,
-                'pub_date__lte': timezone.now()
-            })
-        return (self.model.objects.select_related('author')
-                .filter(**filters).order_by('-pub_date')
-                .annotate(comment_count=Count("comment")))
+        return self.get_posts(author=self.get_profile())
 
     def get_context_data(self, **kwargs):
         """Add profile to the context."""
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User, username=self.kwargs['username']
-        )
+        context['profile'] = self.get_profile()
         return context
 
 
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -29,6 +30,16 @@ LOGIN_REDIRECT_URL = 'blog:index'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media/'
 
+# Widths of resized post images used in `srcset`.
+POST_IMAGE_WIDTHS = (320, 640, 1280)
+
+# Post lists pagination: 'pages' (numbered) or 'cursor' (keyset).
+POSTS_PAGINATION = 'pages'
+
+# Post search index: 'fts5' (SQLite FTS5), 'inverted' (pure Python) or
+# 'auto' (FTS5 when the SQLite build supports it).
+SEARCH_BACKEND = 'auto'
+
 # E-mail settings.
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails/'
@@ -43,10 +54,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'django_bootstrap5'
+    'django_bootstrap5',
+    'django_perf',
 ]
 
 MIDDLEWARE = [
+    'django_perf.PerfMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,9 +67,13 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'django_perf.routers.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
+# Route async variants of the read-only views; `blogicum/asgi.py` turns
+# it on for ASGI servers.
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', '0') == '1'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
@@ -82,9 +99,80 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse connections between requests instead of reopening the file.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# SQLite tuning applied to every new connection (see django_perf/sqlite.py);
+# `python manage.py benchmark_sqlite` compares it with the defaults.
+SQLITE_PRAGMAS = {
+    # Readers do not block the writer and the writer does not block them.
+    'journal_mode': 'WAL',
+    # With WAL, fsync only on checkpoints; a power loss may lose the last
+    # transactions but never corrupts the database.
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Page cache per connection, negative values are KiB.
+    'cache_size': -64 * 1024,
+    # Milliseconds to wait for a lock before "database is locked".
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+# Read replicas for read-only views, see django_perf/routers.py. Locally a
+# copy of the database will do: DATABASE_REPLICAS=replica.sqlite3
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+        filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / name,
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['django_perf.routers.ReplicaRouter']
+# Seconds a client reads from the primary after a write.
+REPLICA_PIN_SECONDS = 5
+
+# Cache (rendered post cards and feed pages for anonymous visitors).
+# Cached feed pages expire when the next scheduled post is published,
+# but are never older than FEED_CACHE_TIMEOUT seconds.
+FEED_CACHE_TIMEOUT = 60 * 60
+# Feed and search pages cache the number of posts for up to
+# POST_COUNT_CACHE_TIMEOUT seconds and count at most POST_COUNT_LIMIT
+# of them: bigger lists show "more than POST_COUNT_LIMIT" posts.
+POST_COUNT_CACHE_TIMEOUT = 60
+POST_COUNT_LIMIT = 10000
+
+# Cached pages are invalidated, scheduled posts are published, post
+# counts are kept up to date and clients are pinned to the primary
+# database (REPLICA_PIN_SECONDS) through this cache, so every server
+# process must use the same one: memcached at CACHE_LOCATION, e.g.
+# CACHE_LOCATION=127.0.0.1:11211.
+CACHE_LOCATION = os.getenv('CACHE_LOCATION')
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_LOCATION,
+        }
+    }
+    CACHE_STALE_SECONDS = None
+else:
+    # The memory of a single process: fine for one worker. With several,
+    # a change invalidates the cache of one of them only, so others may
+    # serve stale data for up to CACHE_STALE_SECONDS, the longest time
+    # anything is cached for. Replica pinning needs a shared cache.
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    CACHE_STALE_SECONDS = 60
+
 # Password validation.
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -17,6 +17,7 @@ from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 from django.urls import path, include, reverse_lazy
+from django_perf import slow_queries_view, slowest_views
 
 
 handler403 = 'pages.views.handler403'
@@ -25,6 +26,8 @@ handler500 = 'pages.views.handler500'
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('perf/slowest/', slowest_views, name='slowest_views'),
+    path('perf/slow-queries/', slow_queries_view, name='slow_queries'),
     path('', include('blog.urls')),
     path('pages/', include('pages.urls')),
     path('auth/', include('django.contrib.auth.urls')),
@@ -33,6 +33,10 @@ class PostModelAdapter(StudentModelAdapter):
             "author",
             "category",
             "location",
+            "updated_at",
+            "comment_count",
+            "image_width",
+            "image_height",
             "refresh_from_db",
         ]
 
@@ -18,6 +18,7 @@ from typing import (
 
 import pytest
 from django.apps import apps
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from django.db.models import Model, Field
 from django.forms import BaseForm
@@ -41,6 +42,13 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,176 @@
+import asyncio
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django_perf import PerfMiddleware, slow_queries
+
+from blog.caching import feed_page_key
+from blog.views import (
+    AsyncPostCategoryListView, AsyncPostDetailView, AsyncPostIndexListView,
+    AsyncProfileListView, PostCategoryListView, PostDetailView,
+    PostIndexListView, ProfileListView
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _get(rf, view_class, user, method='get', **kwargs):
+    request = getattr(rf, method)('/')
+    request.user = user
+    view = view_class.as_view()
+    if asyncio.iscoroutinefunction(view):
+        return async_to_sync(view)(request, **kwargs)
+    return view(request, **kwargs)
+
+
+def _context(response):
+    context = response.context_data
+    page = context.get('page_obj')
+    return {
+        'page': list(page) if page else None,
+        'object': context.get('object'),
+        'category': context.get('category'),
+        'profile': context.get('profile'),
+    }
+
+
+def _view_kwargs(post):
+    return {
+        'index': (AsyncPostIndexListView, PostIndexListView, {}),
+        'category': (
+            AsyncPostCategoryListView, PostCategoryListView,
+            {'category_slug': post.category.slug}
+        ),
+        'detail': (
+            AsyncPostDetailView, PostDetailView, {'post_id': post.pk}
+        ),
+        'profile': (
+            AsyncProfileListView, ProfileListView,
+            {'username': post.author.username}
+        ),
+    }
+
+
+# Category and profile pages query the database from several threads,
+# which only see committed data.
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('name', ['index', 'category', 'detail', 'profile'])
+def test_async_views_match_sync(rf, name, post_with_published_location,
+                                another_user):
+    async_class, sync_class, kwargs = _view_kwargs(
+        post_with_published_location
+    )[name]
+    assert asyncio.iscoroutinefunction(async_class.as_view()), (
+        f'Убедитесь, что `{async_class.__name__}` - асинхронное представление.'
+    )
+    async_response = _get(rf, async_class, another_user, **kwargs)
+    sync_response = _get(rf, sync_class, another_user, **kwargs)
+    assert async_response.status_code == 200
+    assert _context(async_response) == _context(sync_response), (
+        f'Проверьте, что `{async_class.__name__}` передаёт в шаблон то же, '
+        f'что и `{sync_class.__name__}`.'
+    )
+    assert post_with_published_location.title in (
+        async_response.render().content.decode()
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_list_pages(rf, mixer, user, another_user, published_category):
+    mixer.cycle(15).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, location=None
+    )
+    kwargs = {
+        AsyncPostCategoryListView: {
+            'category_slug': published_category.slug
+        },
+        AsyncProfileListView: {'username': user.username},
+    }
+    for view_class, view_kwargs in kwargs.items():
+        response = _get(rf, view_class, another_user, **view_kwargs)
+        page = response.context_data['page_obj']
+        assert len(page) == 10
+        assert page.paginator.count == 15, (
+            f'Проверьте, что `{view_class.__name__}` получает число '
+            'публикаций вместе с категорией или профилем.'
+        )
+        request = rf.get('/', {'page': 2})
+        request.user = another_user
+        response = async_to_sync(view_class.as_view())(request, **view_kwargs)
+        assert len(response.context_data['page_obj']) == 5
+        request = rf.get('/', {'page': 3})
+        request.user = another_user
+        with pytest.raises(Http404):
+            async_to_sync(view_class.as_view())(request, **view_kwargs)
+
+
+def test_async_views_errors(rf, another_user):
+    with pytest.raises(Http404):
+        _get(rf, AsyncPostDetailView, another_user, post_id=1000)
+    with pytest.raises(Http404):
+        _get(rf, AsyncPostCategoryListView, another_user,
+             category_slug='missing')
+    response = _get(rf, AsyncPostIndexListView, another_user, method='post')
+    assert response.status_code == 405
+
+
+def test_async_index_page_cache(rf, post_with_published_location):
+    request = rf.get('/')
+    request.user = AnonymousUser()
+    async_to_sync(AsyncPostIndexListView.as_view())(request).render()
+    assert cache.get(feed_page_key(request)) is not None, (
+        'Убедитесь, что асинхронная главная страница кешируется для '
+        'анонимных пользователей.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_queries_counted(rf, settings, user):
+    settings.SLOW_QUERY_MS = 0
+    slow_queries.reset()
+    middleware = PerfMiddleware(lambda request: _get(
+        rf, AsyncProfileListView, AnonymousUser(), username=user.username
+    ))
+    middleware(rf.get('/'))
+    queries = ' '.join(row['fingerprint'] for row in slow_queries.worst(100))
+    slow_queries.reset()
+    assert '"auth_user"' in queries and '"blog_post"' in queries, (
+        'Убедитесь, что запросы, выполненные в отдельных потоках, '
+        'учитываются в статистике запроса.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views_run_concurrently(rf, monkeypatch, another_user,
+                                      post_with_published_location):
+    def slow_context(self):
+        time.sleep(0.3)
+        return get_detail_context(self)
+
+    get_detail_context = AsyncPostDetailView.get_detail_context
+    monkeypatch.setattr(
+        AsyncPostDetailView, 'get_detail_context', slow_context
+    )
+    view = AsyncPostDetailView.as_view()
+
+    async def get_all():
+        requests = [rf.get('/') for _ in range(4)]
+        for request in requests:
+            request.user = another_user
+        return await asyncio.gather(*(
+            view(request, post_id=post_with_published_location.pk)
+            for request in requests
+        ))
+
+    start = time.perf_counter()
+    responses = async_to_sync(get_all)()
+    assert all(response.status_code == 200 for response in responses)
+    assert time.perf_counter() - start < 0.9, (
+        'Убедитесь, что асинхронные представления работают с базой данных '
+        'в своих потоках, а не по очереди в одном.'
+    )
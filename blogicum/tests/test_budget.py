@@ -0,0 +1,140 @@
+"""Query-count and latency budgets for the main blogicum pages.
+
+Pages are rendered against seeded datasets of several sizes. Sizes and
+the latency budget can be changed without editing the tests:
+
+    BLOGICUM_BUDGET_SIZES=10,1000,100000 BLOGICUM_BUDGET_P95_MS=150 pytest
+"""
+import os
+import statistics
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+BUDGET_SIZES = [
+    int(size)
+    for size in os.getenv('BLOGICUM_BUDGET_SIZES', '10,1000').split(',')
+]
+P95_BUDGET_MS = float(os.getenv('BLOGICUM_BUDGET_P95_MS', '250'))
+N_TIMED_REQUESTS = 20
+N_AUTHORS = 10
+N_CATEGORIES = 5
+N_LOCATIONS = 5
+N_DETAIL_COMMENTS = 50
+BATCH_SIZE = 1000
+
+# Maximum number of SQL queries per page for an anonymous visitor and for
+# a logged-in one (session and user lookups). Pages cached for anonymous
+# visitors also look up the next scheduled publication on a cache miss.
+QUERY_BUDGETS = {
+    'index': 3,
+    'category': 4,
+    'profile': 3,
+    'detail': 2,
+}
+AUTH_QUERIES = 2
+
+User = get_user_model()
+
+
+def seed(n_posts):
+    """Create n_posts published posts with authors, categories, locations
+    and comments using batched inserts."""
+    now = timezone.now()
+    User.objects.bulk_create(
+        User(username=f'budget_author_{i}') for i in range(N_AUTHORS)
+    )
+    Category.objects.bulk_create(
+        Category(title=f'Категория {i}', description='Описание',
+                 slug=f'budget-category-{i}')
+        for i in range(N_CATEGORIES)
+    )
+    Location.objects.bulk_create(
+        Location(name=f'Место {i}') for i in range(N_LOCATIONS)
+    )
+    # bulk_create() does not set primary keys on SQLite.
+    authors = list(User.objects.filter(username__startswith='budget_'))
+    categories = list(Category.objects.filter(slug__startswith='budget-'))
+    locations = list(Location.objects.filter(name__startswith='Место '))
+    Post.objects.bulk_create(
+        (
+            Post(
+                title=f'Публикация {i}', text='Текст публикации ' * 20,
+                pub_date=now - timedelta(minutes=i),
+                author=authors[i % N_AUTHORS],
+                category=categories[i % N_CATEGORIES],
+                location=locations[i % N_LOCATIONS],
+            )
+            for i in range(n_posts)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    detail_post = Post.objects.order_by('-pub_date').first()
+    Comment.objects.bulk_create(
+        Comment(post=detail_post, author=authors[i % N_AUTHORS],
+                text=f'Комментарий {i}')
+        for i in range(N_DETAIL_COMMENTS)
+    )
+    Post.objects.filter(pk=detail_post.pk).update(
+        comment_count=N_DETAIL_COMMENTS
+    )
+    return {
+        'index': '/',
+        'category': f'/category/{categories[0].slug}/',
+        'profile': f'/profile/{authors[0].username}/',
+        'detail': f'/posts/{detail_post.pk}/',
+    }, authors[0]
+
+
+@pytest.fixture(scope='module', params=BUDGET_SIZES, ids=lambda n: f'{n}')
+def seeded_urls(request, django_db_setup, django_db_blocker):
+    """Seed the database once per size and roll it back afterwards."""
+    with django_db_blocker.unblock():
+        with transaction.atomic():
+            yield seed(request.param)
+            transaction.set_rollback(True)
+
+
+def p95_ms(client, url):
+    """Time cache misses: cached pages would not measure the rendering."""
+    timings = []
+    for _ in range(N_TIMED_REQUESTS):
+        cache.clear()
+        start = time.perf_counter()
+        client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.quantiles(timings, n=20)[-1]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('page', QUERY_BUDGETS)
+@pytest.mark.parametrize('logged_in', [False, True], ids=['anon', 'auth'])
+def test_page_budget(
+        seeded_urls, page, logged_in, django_assert_max_num_queries
+):
+    urls, author = seeded_urls
+    client = Client()
+    max_queries = QUERY_BUDGETS[page]
+    if logged_in:
+        client.force_login(author)
+        max_queries += AUTH_QUERIES
+
+    cache.clear()
+    with django_assert_max_num_queries(max_queries):
+        response = client.get(urls[page])
+    assert response.status_code == HTTPStatus.OK
+
+    elapsed = p95_ms(client, urls[page])
+    assert elapsed <= P95_BUDGET_MS, (
+        f"95-й перцентиль времени ответа страницы `{urls[page]}` "
+        f"({elapsed:.1f} мс) превышает бюджет {P95_BUDGET_MS} мс."
+    )
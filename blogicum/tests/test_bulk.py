@@ -0,0 +1,86 @@
+import io
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Sum
+from django.utils import timezone
+
+from blog import bulk
+from blog.caching import get_next_visibility_change
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_iter_json_records(monkeypatch):
+    monkeypatch.setattr(bulk, 'READ_SIZE', 7)
+    records = [{'model': 'blog.location', 'pk': i, 'fields': {'name': 'Ё'}}
+               for i in range(5)]
+    array = json.dumps(records, indent=2, ensure_ascii=False)
+    lines = '\n'.join(json.dumps(record) for record in records) + '\n'
+    for text in (array, lines, '[]', ''):
+        expected = records if len(text) > 2 else []
+        assert list(bulk.iter_json_records(io.StringIO(text))) == expected
+    with pytest.raises(ValueError):
+        list(bulk.iter_json_records(io.StringIO(array[:-10])))
+
+
+def test_generate_fake_data():
+    call_command(
+        'generate_fake_data', users=5, posts=30, comments=60, categories=2,
+        locations=3, batch_size=7, seed=1, stdout=StringIO()
+    )
+    assert Post.objects.count() == 30
+    assert Comment.objects.count() == 60
+    assert Post.objects.aggregate(total=Sum('comment_count'))['total'] == (
+        60
+    ), (
+        "Убедитесь, что после генерации данных счётчики комментариев "
+        "публикаций пересчитаны."
+    )
+
+
+@pytest.mark.parametrize('jsonl', [False, True], ids=['json', 'jsonl'])
+def test_bulkdump_bulkload_round_trip(tmp_path, jsonl):
+    call_command(
+        'generate_fake_data', users=3, posts=20, comments=40, seed=2,
+        stdout=StringIO()
+    )
+    fixture = tmp_path / 'dump.json'
+    dump_options = {'output': str(fixture), 'jsonl': jsonl, 'batch_size': 6}
+    call_command('bulkdump', **dump_options, stderr=StringIO())
+    before = fixture.read_text(encoding='utf-8')
+
+    Post.objects.all().delete()
+    out = StringIO()
+    call_command('bulkload', str(fixture), batch_size=8, stdout=out)
+    assert 'Installed ' in out.getvalue()
+    call_command('bulkdump', **dump_options, stderr=StringIO())
+    assert fixture.read_text(encoding='utf-8') == before, (
+        "Убедитесь, что `bulkload` восстанавливает объекты из выгрузки "
+        "`bulkdump` без изменений, включая даты создания."
+    )
+    # Loading over existing objects updates them like loaddata does.
+    call_command('bulkload', str(fixture), stdout=StringIO())
+    assert Post.objects.count() == 20
+
+
+def test_bulkload_refreshes_next_publication(tmp_path, user,
+                                             published_category):
+    assert get_next_visibility_change() is None
+    pub_date = (timezone.now() + timedelta(days=1)).replace(microsecond=0)
+    fixture = tmp_path / 'scheduled.json'
+    fixture.write_text(json.dumps([{'model': 'blog.post', 'fields': {
+        'title': 'Отложенная', 'text': 'Текст', 'pub_date': pub_date,
+        'author': user.pk, 'category': published_category.pk,
+    }}], cls=DjangoJSONEncoder), encoding='utf-8')
+    call_command('bulkload', str(fixture), database='default',
+                 stdout=StringIO())
+    assert get_next_visibility_change() == pub_date, (
+        "Убедитесь, что после `bulkload` кэшированные страницы истекают "
+        "к публикации загруженных отложенных постов."
+    )
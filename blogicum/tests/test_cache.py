@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.caching import get_next_visibility_change
+from blog.views import PostIndexListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_fragment_cache(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    category, location = post.category, post.location
+    assert post.title in user_client.get('/').content.decode('utf-8')
+
+    # Queryset updates bypass auto_now, so the cached card is reused.
+    type(post).objects.filter(pk=post.pk).update(title='Новый заголовок')
+    assert 'Новый заголовок' not in (
+        user_client.get('/').content.decode('utf-8')
+    ), "Убедитесь, что карточка публикации берётся из кеша."
+
+    for obj, attr, value in (
+            (post, 'title', 'Новый заголовок'),
+            (category, 'title', 'Новая категория'),
+            (location, 'name', 'Новое место'),
+    ):
+        setattr(obj, attr, value)
+        obj.save()
+        assert value in user_client.get('/').content.decode('utf-8'), (
+            "Убедитесь, что кеш карточки публикации сбрасывается при "
+            "изменении публикации, её категории или местоположения."
+        )
+
+
+def test_anonymous_feed_page_cache(
+        client, user_client, mixer, post_with_published_location,
+        django_assert_num_queries
+):
+    post = post_with_published_location
+    urls = ('/', f'/category/{post.category.slug}/')
+    for url in urls:
+        client.get(url)
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert post.title in response.content.decode('utf-8'), (
+            f"Убедитесь, что страница `{url}` для анонимных посетителей "
+            "отдаётся из кеша."
+        )
+
+    mixer.blend(
+        'blog.Post', title='Свежая публикация', author=post.author,
+        category=post.category, location=post.location
+    )
+    for url in urls:
+        assert 'Свежая публикация' in client.get(url).content.decode(
+            'utf-8'
+        ), (
+            f"Убедитесь, что кеш страницы `{url}` сбрасывается при "
+            "добавлении публикации."
+        )
+
+    user_client.get('/')
+    response = user_client.get('/')
+    assert response.context is not None, (
+        "Убедитесь, что страницы для авторизованных пользователей "
+        "не отдаются из кеша."
+    )
+
+
+def test_feed_cache_expires_with_scheduled_post(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    assert get_next_visibility_change() is None
+    pub_date = timezone.now() + timedelta(minutes=5)
+    mixer.blend(
+        'blog.Post', author=post.author, category=post.category,
+        pub_date=pub_date
+    )
+    assert get_next_visibility_change() == pub_date, (
+        "Убедитесь, что отслеживается дата ближайшей отложенной публикации."
+    )
+    timeout = PostIndexListView().get_page_cache_timeout()
+    assert 0 < timeout <= 5 * 60, (
+        "Убедитесь, что страница ленты кешируется не дольше, чем до "
+        "ближайшей отложенной публикации."
+    )
+
+
+def test_cache_timeouts_without_shared_cache(settings):
+    settings.FEED_CACHE_TIMEOUT = 60 * 60
+    settings.CACHE_STALE_SECONDS = None
+    assert PostIndexListView().get_page_cache_timeout() == 60 * 60
+    settings.CACHE_STALE_SECONDS = 60
+    assert PostIndexListView().get_page_cache_timeout() == 60, (
+        "Убедитесь, что без общего для процессов кеша страницы кешируются "
+        "не дольше `CACHE_STALE_SECONDS`."
+    )
@@ -0,0 +1,118 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_views(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.comment_count == 0
+    for i in range(2):
+        response = user_client.post(
+            f'/posts/{post.id}/comment/', {'text': f'Комментарий {i}'}
+        )
+        assert response.status_code == HTTPStatus.FOUND
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при добавлении комментария увеличивается счётчик "
+        "комментариев публикации."
+    )
+
+    comment = post.comment.first()
+    response = user_client.post(
+        f'/posts/{post.id}/delete_comment/{comment.id}/'
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик "
+        "комментариев публикации."
+    )
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=0)
+    call_command('recount_comments', batch_size=1, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что команда `recount_comments` пересчитывает счётчик "
+        "комментариев публикаций."
+    )
+
+
+def test_comment_count_follows_admin(admin_client, mixer,
+                                     post_with_published_location):
+    post = post_with_published_location
+    other_post = mixer.blend('blog.Post')
+    comment = mixer.blend('blog.Comment', post=post)
+    response = admin_client.post(
+        f'/admin/blog/comment/{comment.id}/change/',
+        {'text': comment.text, 'post': other_post.id,
+         'author': comment.author.id}
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    post.refresh_from_db()
+    other_post.refresh_from_db()
+    assert (post.comment_count, other_post.comment_count) == (0, 1), (
+        "Убедитесь, что счётчик комментариев обновляется при изменении "
+        "комментариев в админке."
+    )
+    response = admin_client.post(
+        f'/admin/blog/comment/{comment.id}/delete/', {'post': 'yes'}
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    other_post.refresh_from_db()
+    assert other_post.comment_count == 0
+
+
+def test_comment_count_on_post_delete(mixer, post_with_published_location,
+                                      django_assert_max_num_queries):
+    post = post_with_published_location
+    mixer.cycle(5).blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 5
+    # Comments of the deleted post don't update its counter one by one.
+    with django_assert_max_num_queries(6):
+        post.delete()
+
+
+def test_comment_count_in_other_database(tmp_path):
+    alias = 'comment_count'
+    connections.settings[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(tmp_path / 'other.sqlite3'),
+    }
+    try:
+        call_command('migrate', database=alias, verbosity=0)
+        author = get_user_model().objects.db_manager(alias).create_user(
+            'author'
+        )
+        post = Post.objects.using(alias).create(
+            title='Публикация', text='Текст', pub_date=timezone.now(),
+            author=author
+        )
+        Comment.objects.using(alias).create(
+            post=post, author=author, text='Комментарий'
+        )
+        assert Post.objects.using(alias).get().comment_count == 1, (
+            "Убедитесь, что счётчик комментариев обновляется в той базе "
+            "данных, в которую сохранён комментарий."
+        )
+        Comment.objects.using(alias).delete()
+        assert Post.objects.using(alias).get().comment_count == 0
+    finally:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
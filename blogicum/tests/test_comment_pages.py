@@ -0,0 +1,55 @@
+import re
+from http import HTTPStatus
+
+import pytest
+
+from blog.views.posts import COMMENTS_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+MORE_RE = re.compile(r'href="(/posts/\d+/comments/\?cursor=[\w-]+)"')
+
+
+def test_comments_are_paginated(
+        mixer, user_client, post_with_published_location,
+        django_assert_max_num_queries
+):
+    post = post_with_published_location
+    n_comments = COMMENTS_PER_PAGE * 2 + 5
+    comments = mixer.cycle(n_comments).blend(
+        'blog.Comment', post=post,
+        text=mixer.sequence(lambda i: f'Комментарий номер {i}.')
+    )
+
+    response = user_client.get(f'/posts/{post.id}/')
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context['comments']) == COMMENTS_PER_PAGE, (
+        "Убедитесь, что на странице публикации выводится только первая "
+        "страница комментариев."
+    )
+
+    seen = list(response.context['comments'])
+    next_links = MORE_RE.findall(response.content.decode('utf-8'))
+    while next_links:
+        assert len(next_links) == 1
+        with django_assert_max_num_queries(4):
+            response = user_client.get(next_links[0])
+        assert response.status_code == HTTPStatus.OK
+        seen.extend(response.context['comments'])
+        next_links = MORE_RE.findall(response.content.decode('utf-8'))
+
+    expected = sorted(comments, key=lambda c: (c.created_at, c.id))
+    assert [c.id for c in seen] == [c.id for c in expected], (
+        "Убедитесь, что подгрузка комментариев выводит все комментарии "
+        "«от старых к новым» без повторов."
+    )
+
+
+def test_comment_fragment_hides_unpublished_post(
+        another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = another_user_client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
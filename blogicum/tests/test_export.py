@@ -0,0 +1,47 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _export(**options):
+    out = StringIO()
+    call_command('export_content', stdout=out, stderr=StringIO(), **options)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_export_content(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    rows = _export(chunk_size=2)
+    assert sorted(row['model'] for row in rows) == [
+        'category', 'comment', 'comment', 'comment', 'location', 'post'
+    ]
+    post_row = next(row for row in rows if row['model'] == 'post')
+    assert post_row['id'] == post.id
+    assert post_row['author_id'] == post.author_id
+    assert post_row['title'] == post.title
+
+
+def test_export_content_watermark(
+        tmp_path, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    state = str(tmp_path / 'state.json')
+    assert len(_export(state=state, models=['post', 'comment'])) == 1
+    assert _export(state=state, models=['post', 'comment']) == [], (
+        "Убедитесь, что повторная выгрузка с тем же файлом состояния "
+        "не выгружает объекты ещё раз."
+    )
+    comment = mixer.blend('blog.Comment', post=post)
+    rows = _export(state=state, models=['post', 'comment'])
+    assert [(row['model'], row['id']) for row in rows] == [
+        ('comment', comment.id)
+    ], (
+        "Убедитесь, что выгрузка с файлом состояния содержит только "
+        "объекты, созданные после предыдущей выгрузки."
+    )
+    assert len(_export(since='2000-01-01T00:00:00')) == 4
@@ -0,0 +1,106 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from blog.caching import get_next_visibility_change
+from blog.paginators import KeysetPaginator
+from blog.views import (
+    PostIndexListView, PostCategoryListView, ProfileListView
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return ' | '.join(row[-1] for row in cursor.fetchall())
+
+
+def get_view_queryset(view_class, user, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = user
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Query plans are SQLite-specific.'
+)
+@pytest.mark.parametrize(
+    ('view_class', 'index_name', 'viewer'),
+    [
+        (PostIndexListView, 'post_published_feed_idx', 'another_user'),
+        (PostCategoryListView, 'post_published_category_idx',
+         'another_user'),
+        (ProfileListView, 'post_author_pub_date_idx', 'another_user'),
+        (ProfileListView, 'post_author_pub_date_idx', 'user'),
+    ],
+    ids=['index', 'category', 'profile', 'own_profile'],
+)
+def test_feed_queries_use_indexes(
+        request, user, published_category, view_class, index_name, viewer
+):
+    queryset = get_view_queryset(
+        view_class, request.getfixturevalue(viewer),
+        category_slug=published_category.slug, username=user.username
+    )
+    paginator = KeysetPaginator(10)
+    keyset_query = queryset.filter(
+        paginator._after(published_category.created_at, 1)
+    ).order_by(*paginator._ordering())
+    for query in (queryset[:10], keyset_query[:11]):
+        plan = explain(query)
+        assert f'USING INDEX {index_name}' in plan, (
+            f"Убедитесь, что запрос ленты использует индекс `{index_name}`."
+            f" План запроса: {plan}"
+        )
+        assert 'TEMP B-TREE' not in plan, (
+            "Убедитесь, что сортировка ленты выполняется по индексу."
+            f" План запроса: {plan}"
+        )
+    plan = explain(keyset_query[:11])
+    assert re.search(rf'{index_name} \([^)]*pub_date<\?\)', plan), (
+        "Убедитесь, что следующая страница ленты ищется по дате в индексе, "
+        f"а не просмотром индекса до курсора. План запроса: {plan}"
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Query plans are SQLite-specific.'
+)
+def test_comment_pages_use_index(post_with_published_location):
+    paginator = KeysetPaginator(
+        20, date_field='created_at', descending=False
+    )
+    plan = explain(
+        post_with_published_location.comment.filter(
+            paginator._after(post_with_published_location.created_at, 1)
+        ).order_by(*paginator._ordering())[:21]
+    )
+    assert re.search(
+        r'comment_post_created_idx \(post_id=\? AND created_at>\?\)', plan
+    ), (
+        "Убедитесь, что следующая страница комментариев ищется по дате в "
+        f"индексе. План запроса: {plan}"
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Query plans are SQLite-specific.'
+)
+def test_next_scheduled_post_query_uses_index():
+    with CaptureQueriesContext(connection) as queries:
+        get_next_visibility_change()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {queries[0]["sql"]}')
+        plan = ' | '.join(row[-1] for row in cursor.fetchall())
+    assert 'USING INDEX post_published_feed_idx' in plan, (
+        "Убедитесь, что поиск ближайшей отложенной публикации использует "
+        f"индекс. План запроса: {plan}"
+    )
@@ -0,0 +1,140 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+CURSOR_RE = re.compile(r'href="\?cursor=([\w-]*)"')
+
+
+def _get_cursor_page(client, url, cursor=''):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, {'cursor': cursor})
+    assert response.status_code == HTTPStatus.OK, (
+        f"Убедитесь, что страница `{url}` с курсорной пагинацией "
+        "загружается без ошибок."
+    )
+    assert not any(
+        query['sql'].startswith('SELECT COUNT(*)')
+        for query in queries.captured_queries
+    ), (
+        "Убедитесь, что курсорная пагинация не выполняет запрос `COUNT(*)`."
+    )
+    return response
+
+
+def test_cursor_pagination(
+        user_client, user, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    category = posts[0].category
+    expected_ids = [
+        post.id for post in sorted(
+            posts, key=lambda post: (post.pub_date, post.id), reverse=True
+        )
+    ]
+    for url in ('/', f'/category/{category.slug}/',
+                f'/profile/{user.username}/'):
+        seen_ids, pages, cursor = [], [], ''
+        while cursor is not None:
+            response = _get_cursor_page(user_client, url, cursor)
+            page_obj = response.context['page_obj']
+            assert len(page_obj) <= N_PER_PAGE
+            if page_obj.has_next():
+                assert page_obj.next_cursor in CURSOR_RE.findall(
+                    response.content.decode('utf-8')
+                ), (
+                    f"Убедитесь, что на странице `{url}` выводится ссылка "
+                    "на следующую страницу курсорной пагинации."
+                )
+            seen_ids.extend(post.id for post in page_obj)
+            pages.append([post.id for post in page_obj])
+            cursor = page_obj.next_cursor
+        assert seen_ids == expected_ids, (
+            f"Убедитесь, что на странице `{url}` курсорная пагинация "
+            "выводит все публикации «от новых к старым» без повторов."
+        )
+
+        response = _get_cursor_page(
+            user_client, url, page_obj.previous_cursor
+        )
+        assert [post.id for post in response.context['page_obj']] == (
+            pages[-2]
+        ), (
+            f"Убедитесь, что на странице `{url}` ссылка на предыдущую "
+            "страницу курсорной пагинации ведёт на предыдущую страницу."
+        )
+
+
+def test_cursor_pagination_bad_cursor(user_client):
+    response = user_client.get('/', {'cursor': 'not-a-cursor'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def _count_queries(client, url, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    counts = [query for query in queries.captured_queries
+              if query['sql'].startswith('SELECT COUNT(*)')]
+    return response, len(counts)
+
+
+def test_cached_post_count(
+        mixer, user_client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    post_model = type(posts[0])
+    for expected_counts in (1, 0):
+        response, counts = _count_queries(user_client, '/')
+        assert counts == expected_counts, (
+            "Убедитесь, что число публикаций в ленте берётся из кеша."
+        )
+    assert response.context['paginator'].count == (
+        post_model.objects.published().count()
+    )
+
+    hidden_post = post_model.objects.published().first()
+    hidden_post.is_published = False
+    hidden_post.save()
+    post_model.objects.published().last().delete()
+    mixer.blend(
+        'blog.Post', author=posts[0].author, category=posts[0].category,
+        pub_date=hidden_post.pub_date, is_published=True
+    )
+    response, counts = _count_queries(user_client, '/')
+    assert counts == 0
+    assert response.context['paginator'].count == (
+        post_model.objects.published().count()
+    ), (
+        "Убедитесь, что кешированное число публикаций обновляется при "
+        "публикации, скрытии и удалении постов."
+    )
+
+    posts[0].category.is_published = False
+    posts[0].category.save()
+    response, counts = _count_queries(user_client, '/')
+    assert counts == 1, (
+        "Убедитесь, что число публикаций пересчитывается при снятии "
+        "категории с публикации."
+    )
+
+
+def test_approximate_post_count(
+        settings, user_client, many_posts_with_published_locations
+):
+    settings.POST_COUNT_LIMIT = N_PER_PAGE
+    response = user_client.get('/')
+    paginator = response.context['paginator']
+    assert paginator.is_approximate and paginator.count == N_PER_PAGE, (
+        "Убедитесь, что для больших лент число публикаций оценивается "
+        "сверху значением `POST_COUNT_LIMIT`."
+    )
+    assert 'Последняя' not in response.content.decode('utf-8')
+    assert user_client.get('/', {'page': 2}).status_code == (
+        HTTPStatus.NOT_FOUND
+    )
@@ -0,0 +1,91 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_page_queries(client, url):
+    # Post counts are cached: count every page with a cold cache.
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    return len(queries)
+
+
+def test_feed_pages_have_no_n_plus_one(
+        mixer, user, user_client, published_category, published_locations
+):
+    urls = (
+        '/', f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/'
+    )
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_locations[0]
+    )
+    one_post_queries = {url: count_page_queries(user_client, url)
+                        for url in urls}
+    mixer.cycle(N_PER_PAGE).blend(
+        'blog.Post', author=mixer.SELECT, category=published_category,
+        location=mixer.sequence(*published_locations)
+    )
+    for url in urls:
+        assert count_page_queries(user_client, url) == (
+            one_post_queries[url]
+        ), (
+            f"Убедитесь, что количество SQL-запросов страницы `{url}` "
+            "не зависит от количества публикаций на ней."
+        )
+
+
+def test_list_pages_count_posts_with_their_owner(
+        user, user_client, another_user_client, published_category
+):
+    for client in (user_client, another_user_client):
+        for url in (f'/category/{published_category.slug}/',
+                    f'/profile/{user.username}/'):
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url)
+            assert not [
+                query for query in queries.captured_queries
+                if query['sql'].startswith('SELECT COUNT(*)')
+            ], (
+                f"Убедитесь, что страница `{url}` получает число публикаций "
+                "тем же запросом, что и категорию или профиль."
+            )
+
+
+def count_table_queries(client, url, table):
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    return sum(
+        f'FROM "{table}"' in query['sql'] for query in queries.captured_queries
+    )
+
+
+def test_edit_views_fetch_object_once(
+        mixer, user, user_client, another_user_client,
+        post_with_published_location
+):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    pages = (
+        (f'/posts/{post.id}/edit/', 'blog_post'),
+        (f'/posts/{post.id}/delete/', 'blog_post'),
+        (f'/posts/{post.id}/edit_comment/{comment.id}/', 'blog_comment'),
+        (f'/posts/{post.id}/delete_comment/{comment.id}/', 'blog_comment'),
+    )
+    for client in (user_client, another_user_client):
+        for url, table in pages:
+            assert count_table_queries(client, url, table) == 1, (
+                f"Убедитесь, что страница `{url}` загружает объект "
+                "одним запросом."
+            )
+            assert count_table_queries(client, url, 'auth_user') == 1, (
+                f"Убедитесь, что страница `{url}` проверяет авторство "
+                "без загрузки автора объекта."
+            )
@@ -0,0 +1,17 @@
+import pytest
+from django.urls import resolve
+from django_perf.routers import is_read_only_view
+
+
+@pytest.mark.parametrize('url, read_only', [
+    ('/', True),
+    ('/posts/1/', True),
+    ('/profile/user/', True),
+    ('/posts/1/edit/', False),
+    ('/edit_profile/', False),
+])
+def test_read_only_views(rf, url, read_only):
+    assert is_read_only_view(rf.get(url), resolve(url).func) is read_only, (
+        "Убедитесь, что с реплики читают только страницы, которые не "
+        "изменяют данные."
+    )
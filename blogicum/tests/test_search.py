@@ -0,0 +1,101 @@
+from http import HTTPStatus
+from importlib import import_module
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from blog.search import FTS_TABLE
+
+pytestmark = [pytest.mark.django_db]
+
+BACKENDS = ['fts5', 'inverted']
+
+
+def _search(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что страница поиска `/search/` загружается без ошибок."
+    )
+    return [post.id for post in response.context['page_obj']]
+
+
+@pytest.fixture(params=BACKENDS)
+def search_backend(request, settings):
+    settings.SEARCH_BACKEND = request.param
+    return request.param
+
+
+@pytest.fixture
+def search_posts(search_backend, mixer, user, published_category):
+    def blend(title, text, **kwargs):
+        return mixer.blend(
+            'blog.Post', title=title, text=text, author=user,
+            category=published_category, location=None, **kwargs
+        )
+
+    return (
+        blend('Осенний лес', 'Видели ёжика и белку.'),
+        blend('Рецепт пирога', 'Лес рядом, но речь о выпечке и ежике.'),
+        blend('Лес и ягоды', 'Черника, брусника.', is_published=False),
+    )
+
+
+def test_search_ranks_published_posts(client, search_posts):
+    in_title, in_text, unpublished = search_posts
+    assert _search(client, 'лес') == [in_title.id, in_text.id], (
+        "Убедитесь, что поиск находит опубликованные публикации и выводит "
+        "совпадения в заголовке выше совпадений в тексте."
+    )
+    assert _search(client, 'Ежика БЕЛКУ') == [in_title.id], (
+        "Убедитесь, что поиск не зависит от регистра, не различает «е» и "
+        "«ё» и находит только публикации со всеми словами запроса."
+    )
+    assert _search(client, 'брусника') == []
+    assert _search(client, '') == []
+
+
+def test_search_index_follows_changes(client, search_posts):
+    in_title, in_text, _ = search_posts
+    in_title.title = 'Прогулка по парку'
+    in_title.text = 'Видели белку.'
+    in_title.save()
+    in_text.delete()
+    assert _search(client, 'лес') == []
+    assert _search(client, 'парк') == []
+    assert _search(client, 'парку') == [in_title.id], (
+        "Убедитесь, что поисковый индекс обновляется при изменении и "
+        "удалении публикаций."
+    )
+
+
+def test_rebuild_search_index(client, search_posts):
+    in_title, in_text, _ = search_posts
+    out = StringIO()
+    call_command('rebuild_search_index', stdout=out)
+    assert '3 posts indexed' in out.getvalue()
+    assert _search(client, 'лес') == [in_title.id, in_text.id]
+
+
+def test_admin_search_uses_index(admin_client, search_posts):
+    in_title, in_text, unpublished = search_posts
+    response = admin_client.get('/admin/blog/post/', {'q': 'лес'})
+    assert response.status_code == HTTPStatus.OK
+    assert {post.id for post in response.context['cl'].result_list} == {
+        in_title.id, in_text.id, unpublished.id
+    }
+
+
+def test_migration_folds_search_index(client, search_backend, search_posts):
+    if search_backend != 'fts5':
+        pytest.skip('Миграция заполняет только индекс FTS5.')
+    in_title, _, _ = search_posts
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    migration = import_module('blog.migrations.0014_search_index')
+    migration.create_fts_table(None, connection.schema_editor())
+    assert _search(client, 'ежика') == [in_title.id], (
+        "Убедитесь, что миграция поискового индекса не различает «е» и «ё» "
+        "в уже написанных публикациях."
+    )
@@ -0,0 +1,138 @@
+from http import HTTPStatus
+from io import BytesIO, StringIO
+
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import ImageJob, Post
+from blog.image_queue import enqueue_image_job, queue_stats
+from blog.thumbnails import variant_name
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), color=(73, 109, 137)).save(
+        buffer, format='JPEG'
+    )
+    return SimpleUploadedFile(
+        'big_image.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+def test_image_variants_on_upload(user_client, user, published_category):
+    response = user_client.post('/posts/create/', {
+        'title': 'Публикация с большой картинкой',
+        'text': 'Текст',
+        'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+        'category': published_category.id,
+        'image': make_image(1000, 500),
+    })
+    assert response.status_code == HTTPStatus.FOUND
+    post = Post.objects.get(author=user)
+    assert post.image_jobs.filter(status=ImageJob.Status.PENDING).exists(), (
+        "Убедитесь, что при загрузке изображения ставится задача на "
+        "создание его уменьшенных копий."
+    )
+
+    call_command('process_image_jobs', workers=1, once=True,
+                 stdout=StringIO())
+    post.refresh_from_db()
+    assert not post.image_jobs.exists()
+    assert (post.image_width, post.image_height) == (1000, 500)
+
+    storage = post.image.storage
+    for width in (320, 640):
+        name = variant_name(post.image.name, width)
+        assert storage.exists(name), (
+            "Убедитесь, что при загрузке изображения создаются его "
+            "уменьшенные копии."
+        )
+        with storage.open(name) as variant:
+            assert Image.open(variant).size == (width, width // 2)
+    assert not storage.exists(variant_name(post.image.name, 1280))
+
+    content = user_client.get('/').content.decode('utf-8')
+    assert f'{storage.url(variant_name(post.image.name, 320))} 320w' in (
+        content
+    ), "Убедитесь, что в карточке публикации выводится атрибут `srcset`."
+    assert f'{post.image.url} 1000w' in content
+
+
+def test_generate_thumbnails_command(post_with_published_location):
+    post = post_with_published_location
+    assert post.image_width is None
+    call_command('generate_thumbnails', stdout=StringIO())
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (100, 100), (
+        "Убедитесь, что команда `generate_thumbnails` обрабатывает "
+        "изображения существующих публикаций."
+    )
+
+
+def test_image_job_retries(post_with_published_location):
+    post = post_with_published_location
+    post.image.storage.delete(post.image.name)
+    job = enqueue_image_job(post)
+    options = {'workers': 0, 'once': True, 'max_attempts': 2,
+               'stdout': StringIO(), 'stderr': StringIO()}
+
+    call_command('process_image_jobs', **options)
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (ImageJob.Status.PENDING, 1), (
+        "Убедитесь, что задача с ошибкой возвращается в очередь."
+    )
+    assert job.run_after > timezone.now()
+
+    ImageJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    call_command('process_image_jobs', **options)
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (ImageJob.Status.FAILED, 2), (
+        "Убедитесь, что после исчерпания попыток задача помечается "
+        "как неудачная."
+    )
+    assert queue_stats()[ImageJob.Status.FAILED] == 1
+
+
+def test_image_replaced(user_client, user, published_category):
+    data = {
+        'title': 'Публикация с картинкой',
+        'text': 'Текст',
+        'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+        'category': published_category.id,
+        'image': make_image(1000, 500),
+    }
+    user_client.post('/posts/create/', data)
+    call_command('process_image_jobs', workers=1, once=True,
+                 stdout=StringIO())
+    post = Post.objects.get(author=user)
+
+    data['image'] = make_image(800, 400)
+    user_client.post(f'/posts/{post.id}/edit/', data)
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (None, None), (
+        "Убедитесь, что при замене изображения сбрасываются его размеры."
+    )
+    assert post.image_jobs.filter(status=ImageJob.Status.PENDING).exists()
+    content = user_client.get('/').content.decode('utf-8')
+    assert post.image.url in content
+    assert variant_name(post.image.name, 320) not in content, (
+        "Убедитесь, что до обработки нового изображения выводится "
+        "оригинал, а не его несуществующие уменьшенные копии."
+    )
+
+    call_command('process_image_jobs', workers=1, once=True,
+                 stdout=StringIO())
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (800, 400)
+    post.image = make_image(600, 300)
+    post.save()
+    assert post.image_width is None
+    assert post.image_jobs.filter(status=ImageJob.Status.PENDING).exists(), (
+        "Убедитесь, что задача ставится при любом сохранении публикации "
+        "с новым изображением, не только через форму."
+    )
@@ -0,0 +1,450 @@
+"""Per-request performance instrumentation.
+
+PerfMiddleware measures every request: the number and the time of its
+SQL queries, the time spent rendering templates and the total latency.
+They are aggregated per view in latency histograms kept in the memory
+of the server process and sent back in the `Server-Timing` header,
+which browser developer tools show next to the request. The header
+tells how heavy a page is for the database, so by default only staff
+users get it, or everyone with DEBUG; PERF_SERVER_TIMING setting sends
+it to everyone (True) or to no one (False).
+
+Queries slower than SLOW_QUERY_MS milliseconds (100 by default, None
+turns it off) are logged and aggregated by fingerprint: the SQL with
+literals and parameters replaced by `?`. Each fingerprint keeps the
+views and the lines of project code that issued it.
+
+The `slowest_views` and `slow_queries` views return the statistics as
+JSON to staff users. Every server process collects its own statistics.
+
+The module is shared by the Django projects of the repository; install
+it with `pip install -e ../django_perf` (it is in their requirements).
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+import traceback
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import JsonResponse
+from django.template.base import Template
+
+# Upper bounds of the latency histogram buckets, ms.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+UNRESOLVED_VIEW = '<unresolved>'
+UNKNOWN_LOCATION = '<unknown>'
+DEFAULT_SLOW_QUERY_MS = 100
+
+_current = ContextVar('perf_request', default=None)
+logger = logging.getLogger(__name__)
+
+# Applied in order: literals first, then lists of them.
+FINGERPRINT_RULES = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def fingerprint(sql):
+    """Return the SQL with literals, parameters and their lists as `?`."""
+    for pattern, replacement in FINGERPRINT_RULES:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def get_slow_query_time():
+    """Return the slow query threshold in seconds or None."""
+    milliseconds = getattr(settings, 'SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+    return None if milliseconds is None else milliseconds / 1000
+
+
+def get_caller():
+    """Return `path:line in function` of the innermost project frame.
+
+    Frames outside the template being rendered are not searched.
+    """
+    base_dir = str(settings.BASE_DIR)
+    for frame, lineno in traceback.walk_stack(None):
+        filename = frame.f_code.co_filename
+        if filename == __file__:
+            if frame.f_code.co_name == 'timed_render':
+                return None
+            continue
+        if filename.startswith(base_dir) and 'site-packages' not in filename:
+            path = Path(filename).relative_to(base_dir)
+            return f'{path}:{lineno} in {frame.f_code.co_name}'
+    return None
+
+
+def percentile(buckets, max_time, fraction):
+    """Return the upper bound of the histogram bucket with the percentile."""
+    seen = 0
+    count = sum(buckets)
+    for bound, bucket_count in zip(BUCKETS, buckets):
+        seen += bucket_count
+        if seen >= fraction * count:
+            return min(bound, max_time)
+    return max_time
+
+
+def bucket_index(milliseconds):
+    for index, bound in enumerate(BUCKETS):
+        if milliseconds <= bound:
+            return index
+
+
+class RequestStats:
+    """Costs of a single request, times in seconds."""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+        self.template_name = None
+        self.slow_query_time = get_slow_query_time()
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries += 1
+            self.sql_time += duration
+            if (self.slow_query_time is not None
+                    and duration >= self.slow_query_time):
+                self.log_slow_query(sql, duration)
+
+    def log_slow_query(self, sql, duration):
+        view = (get_view_name(self.request) if self.request is not None
+                else UNRESOLVED_VIEW)
+        location = get_caller()
+        if location is None:
+            # Lazy querysets are often evaluated by templates.
+            location = (f'template {self.template_name}' if self.rendering
+                        else UNKNOWN_LOCATION)
+        slow_queries.record(sql, duration, view, location)
+        logger.warning('Slow query (%.1f ms) in %s at %s: %s',
+                       duration * 1000, view, location, sql)
+
+    def server_timing(self, duration):
+        # Queries of lazy querysets run while rendering, so `sql` and
+        # `tpl` may overlap.
+        return (
+            f'sql;dur={self.sql_time * 1000:.1f};'
+            f'desc="{self.queries} queries", '
+            f'tpl;dur={self.template_time * 1000:.1f}, '
+            f'total;dur={duration * 1000:.1f}'
+        )
+
+
+class ViewStats:
+    """Aggregated costs of the requests to a view, times in ms."""
+
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.total_time = self.max_time = 0.0
+        self.sql_time = self.template_time = 0.0
+        self.queries = self.max_queries = 0
+
+    def add(self, stats, duration):
+        duration *= 1000
+        self.count += 1
+        self.buckets[bucket_index(duration)] += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.sql_time += stats.sql_time * 1000
+        self.template_time += stats.template_time * 1000
+        self.queries += stats.queries
+        self.max_queries = max(self.max_queries, stats.queries)
+
+    def percentile(self, fraction):
+        return percentile(self.buckets, self.max_time, fraction)
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_time / self.count, 1),
+            'p50_ms': round(self.percentile(0.5), 1),
+            'p95_ms': round(self.percentile(0.95), 1),
+            'p99_ms': round(self.percentile(0.99), 1),
+            'max_ms': round(self.max_time, 1),
+            'mean_queries': round(self.queries / self.count, 1),
+            'max_queries': self.max_queries,
+            'mean_sql_ms': round(self.sql_time / self.count, 1),
+            'mean_template_ms': round(self.template_time / self.count, 1),
+            'histogram': {
+                str(bound): count
+                for bound, count in zip(BUCKETS, self.buckets)
+            },
+        }
+
+
+class Registry:
+    """Statistics of all views of the process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def record(self, view, stats, duration):
+        with self.lock:
+            if view not in self.views:
+                self.views[view] = ViewStats()
+            self.views[view].add(stats, duration)
+
+    def slowest(self, limit):
+        with self.lock:
+            views = [
+                {'view': view, **view_stats.as_dict()}
+                for view, view_stats in self.views.items()
+            ]
+        views.sort(key=lambda row: (row['p95_ms'], row['mean_ms']),
+                   reverse=True)
+        return views[:limit]
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+registry = Registry()
+
+
+class QueryStats:
+    """Aggregated slow queries with the same fingerprint, times in ms."""
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.total_time = self.max_time = 0.0
+        self.views = Counter()
+        self.locations = Counter()
+
+    def add(self, duration, view, location):
+        duration *= 1000
+        self.count += 1
+        self.buckets[bucket_index(duration)] += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.views[view] += 1
+        self.locations[location] += 1
+
+    def as_dict(self):
+        return {
+            'fingerprint': self.sql,
+            'id': hashlib.md5(self.sql.encode()).hexdigest()[:12],
+            'count': self.count,
+            'total_ms': round(self.total_time, 1),
+            'mean_ms': round(self.total_time / self.count, 1),
+            'p95_ms': round(percentile(self.buckets, self.max_time, 0.95), 1),
+            'max_ms': round(self.max_time, 1),
+            'views': dict(self.views.most_common(5)),
+            'locations': dict(self.locations.most_common(5)),
+        }
+
+
+class SlowQueryLog:
+    """Slow queries of the process by fingerprint."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queries = {}
+
+    def record(self, sql, duration, view, location):
+        key = fingerprint(sql)
+        with self.lock:
+            if key not in self.queries:
+                self.queries[key] = QueryStats(key)
+            self.queries[key].add(duration, view, location)
+
+    def worst(self, limit):
+        with self.lock:
+            queries = [stats.as_dict() for stats in self.queries.values()]
+        queries.sort(key=lambda row: row['total_ms'], reverse=True)
+        return queries[:limit]
+
+    def reset(self):
+        with self.lock:
+            self.queries.clear()
+
+
+slow_queries = SlowQueryLog()
+
+
+def install_template_timer():
+    """Time Template._render() of the outermost template of a request.
+
+    Django itself patches the same method to collect rendered templates
+    in tests.
+    """
+    render = Template._render
+    if getattr(render, 'timed', False):
+        return
+
+    def timed_render(template, context):
+        stats = _current.get()
+        # Included and extended templates are part of the outermost one.
+        if stats is None or stats.rendering:
+            return render(template, context)
+        stats.rendering = True
+        stats.template_name = template.name
+        start = time.perf_counter()
+        try:
+            return render(template, context)
+        finally:
+            stats.template_time += time.perf_counter() - start
+            stats.rendering = False
+
+    timed_render.timed = True
+    Template._render = timed_render
+
+
+def record_query(execute, sql, params, many, context):
+    """Count the query in the costs of the current request, if any."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats.execute_wrapper(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection):
+    """Wrap all queries of the connection with record_query().
+
+    The wrapper stays for the lifetime of the connection object and finds
+    the request by a context variable, so queries are counted in any
+    thread the request runs code in: connections are per thread, and
+    async views and ASGI run the ORM in threads of their own.
+    """
+    if record_query not in connection.execute_wrappers:
+        # First: execute_wrapper() contexts pop the last wrapper.
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@receiver(connection_created)
+def record_connection_queries(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+def mark_async_capable(middleware):
+    """Make Django await the middleware when get_response is async.
+
+    Django 3.2 looks for the same marker its MiddlewareMixin sets; asgiref
+    3.5 has no markcoroutinefunction().
+    """
+    if asyncio.iscoroutinefunction(middleware.get_response):
+        middleware._is_coroutine = asyncio.coroutines._is_coroutine
+
+
+def get_request_stats():
+    """Return the costs of the current request measured so far or None."""
+    return _current.get()
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else UNRESOLVED_VIEW
+
+
+def sends_server_timing(request):
+    """Return whether the response gets the `Server-Timing` header."""
+    enabled = getattr(settings, 'PERF_SERVER_TIMING', None)
+    if enabled is not None:
+        return enabled
+    user = getattr(request, 'user', None)
+    return settings.DEBUG or bool(user is not None and user.is_staff)
+
+
+class PerfMiddleware:
+    """Measure requests and add the `Server-Timing` header.
+
+    Must come first in MIDDLEWARE to measure the other middleware too.
+    Under ASGI it runs in the event loop, so it does not make Django run
+    the whole chain in one thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        mark_async_capable(self)
+        install_template_timer()
+        # Connections opened before this module was imported.
+        for connection in connections.all():
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        stats = RequestStats(request)
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - start
+        registry.record(get_view_name(request), stats, duration)
+        if sends_server_timing(request):
+            response['Server-Timing'] = stats.server_timing(duration)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats(request)
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - start
+        registry.record(get_view_name(request), stats, duration)
+        # request.user may need a query.
+        if await sync_to_async(sends_server_timing)(request):
+            response['Server-Timing'] = stats.server_timing(duration)
+        return response
+
+
+def get_limit(request):
+    if not request.user.is_staff:
+        raise PermissionDenied
+    try:
+        return int(request.GET.get('limit', 20))
+    except ValueError:
+        return 20
+
+
+def slowest_views(request):
+    """Return the statistics of the slowest views as JSON."""
+    return JsonResponse(
+        {'views': registry.slowest(get_limit(request))},
+        json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def slow_queries_view(request):
+    """Return the slow queries with the highest total time as JSON."""
+    return JsonResponse(
+        {'queries': slow_queries.worst(get_limit(request))},
+        json_dumps_params={'ensure_ascii': False}
+    )
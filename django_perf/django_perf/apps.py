@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class DjangoPerfConfig(AppConfig):
+    name = 'django_perf'
+    verbose_name = 'Производительность'
+
+    def ready(self):
+        from django_perf import sqlite  # noqa: F401
@@ -0,0 +1,136 @@
+"""Routing of read-only views to database replicas.
+
+A request is read-only when it uses a safe method and its view is a DRF
+`list`/`retrieve` action or has the `read_from_replica = True` attribute.
+ReplicaMiddleware picks a random alias from DATABASE_REPLICAS for such a
+request, and ReplicaRouter sends all its reads to that replica. Everything
+else goes to the primary (`default`) database.
+
+After a client writes something, its requests stay on the primary for
+REPLICA_PIN_SECONDS, so it reads its own writes despite replication lag.
+Clients are told apart by the Authorization header or the session key.
+Pins are kept in the default cache, which must be shared by all server
+processes.
+
+    MIDDLEWARE = [..., 'django_perf.routers.ReplicaMiddleware', ...]
+    DATABASE_ROUTERS = ['django_perf.routers.ReplicaRouter']
+"""
+import asyncio
+import hashlib
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from django_perf import mark_async_capable
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+READ_ONLY_ACTIONS = ('list', 'retrieve')
+# A session missing on a lagging replica would log the user out.
+PRIMARY_ONLY_APPS = ('sessions',)
+PIN_KEY = 'replica_pin:{}'
+
+# The replica of a read-only request, None on the primary.
+_replica = ContextVar('replica', default=None)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+def get_client_key(request):
+    """Return the pin cache key of the client or None for a new one."""
+    credentials = request.META.get('HTTP_AUTHORIZATION')
+    if not credentials and hasattr(request, 'session'):
+        credentials = request.session.session_key
+    if not credentials:
+        return None
+    return PIN_KEY.format(hashlib.sha256(credentials.encode()).hexdigest())
+
+
+def is_read_only_view(request, view_func):
+    if request.method not in SAFE_METHODS:
+        return False
+    # DRF viewsets map request methods to actions.
+    actions = getattr(view_func, 'actions', None)
+    if actions:
+        return actions.get(request.method.lower()) in READ_ONLY_ACTIONS
+    view_class = (getattr(view_func, 'view_class', None)
+                  or getattr(view_func, 'cls', None))
+    return getattr(view_class, 'read_from_replica', False)
+
+
+class ReplicaMiddleware:
+    """Mark read-only requests and pin clients to the primary after writes.
+
+    Must come after SessionMiddleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        mark_async_capable(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = _replica.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica.reset(token)
+        self.pin_writer(request)
+        return response
+
+    async def __acall__(self, request):
+        token = _replica.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica.reset(token)
+        await sync_to_async(self.pin_writer)(request)
+        return response
+
+    def pin_writer(self, request):
+        if request.method not in SAFE_METHODS:
+            # The key is taken after the view: login changes the session.
+            key = get_client_key(request)
+            if key:
+                cache.set(
+                    key, True, getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+                )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        replicas = get_replicas()
+        if replicas and is_read_only_view(request, view_func):
+            key = get_client_key(request)
+            if not (key and cache.get(key)):
+                # One replica per request: replicas may lag differently.
+                _replica.set(random.choice(replicas))
+
+
+class ReplicaRouter:
+    """Read from a replica in read-only requests, write to the primary."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        # Objects read from a replica must still be saved to the primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas are copies of the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
@@ -0,0 +1,140 @@
+"""SQLite tuning shared by the projects.
+
+With `django_perf` in INSTALLED_APPS, the SQLITE_PRAGMAS setting is
+applied to every new SQLite connection:
+
+    SQLITE_PRAGMAS = {'journal_mode': 'WAL', 'busy_timeout': 5000}
+
+BenchmarkCommand compares the concurrent read/write throughput of SQLite
+with the default settings and with SQLITE_PRAGMAS and CONN_MAX_AGE. A
+project subclasses it in its `benchmark_sqlite` command with the reads
+and writes of its own models.
+"""
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.test.utils import override_settings
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to every new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+class BenchmarkCommand(BaseCommand):
+    """Run readers and writers against a fresh database per profile.
+
+    Subclasses implement create_data(), read() and write().
+    """
+
+    help = ('Compare concurrent read/write throughput of SQLite with the '
+            'default settings and with SQLITE_PRAGMAS and CONN_MAX_AGE.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument(
+            '--posts', type=int, default=10000,
+            help='Number of posts in the benchmark database.'
+        )
+
+    def handle(self, *args, **options):
+        profiles = {
+            'default': ({}, 0),
+            'tuned': (
+                getattr(settings, 'SQLITE_PRAGMAS', {}),
+                settings.DATABASES[DEFAULT_DB_ALIAS].get('CONN_MAX_AGE', 0)
+            ),
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            for name, (pragmas, conn_max_age) in profiles.items():
+                alias = f'benchmark_{name}'
+                connections.settings[alias] = {
+                    'ENGINE': 'django.db.backends.sqlite3',
+                    'NAME': str(Path(directory) / f'{name}.sqlite3'),
+                    'CONN_MAX_AGE': conn_max_age,
+                }
+                try:
+                    with override_settings(SQLITE_PRAGMAS=pragmas):
+                        self.prepare(alias, options['posts'])
+                        reads, writes, errors = self.run(alias, options)
+                finally:
+                    connections[alias].close()
+                    del connections[alias]
+                    del connections.settings[alias]
+                self.stdout.write(
+                    f'{name:>8}: {reads / options["seconds"]:8.0f} reads/s, '
+                    f'{writes / options["seconds"]:6.0f} writes/s, '
+                    f'{errors} lock errors'
+                )
+
+    def prepare(self, alias, n_posts):
+        call_command('migrate', database=alias, verbosity=0)
+        self.create_data(alias, n_posts)
+        connections[alias].close()
+
+    def create_data(self, alias, n_posts):
+        """Fill the migrated database of alias with n_posts posts."""
+        raise NotImplementedError
+
+    def read(self, alias):
+        raise NotImplementedError
+
+    def write(self, alias, number):
+        """Make the number-th write of a writer thread."""
+        raise NotImplementedError
+
+    def run(self, alias, options):
+        """Run readers and writers for `seconds`, return their totals."""
+        totals = {'read': 0, 'write': 0, 'errors': 0}
+        lock = threading.Lock()
+        n_threads = options['readers'] + options['writers']
+        start = threading.Barrier(n_threads)
+
+        def worker(kind):
+            done = errors = 0
+            start.wait()
+            deadline = time.perf_counter() + options['seconds']
+            try:
+                while time.perf_counter() < deadline:
+                    try:
+                        if kind == 'read':
+                            self.read(alias)
+                        else:
+                            self.write(alias, done)
+                        done += 1
+                    except OperationalError:
+                        errors += 1
+                    finally:
+                        # What Django does at the end of every request.
+                        connections[alias].close_if_unusable_or_obsolete()
+            finally:
+                connections[alias].close()
+            with lock:
+                totals[kind] += done
+                totals['errors'] += errors
+
+        threads = [
+            threading.Thread(target=worker, args=(kind,))
+            for kind in (['read'] * options['readers']
+                         + ['write'] * options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return totals['read'], totals['write'], totals['errors']
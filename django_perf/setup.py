@@ -0,0 +1,10 @@
+from setuptools import setup
+
+setup(
+    name='django-perf',
+    version='0.1.0',
+    description='Per-request performance instrumentation for Django.',
+    packages=['django_perf'],
+    python_requires='>=3.7',
+    install_requires=['Django>=3.2'],
+)
@@ -0,0 +1,174 @@
+import asyncio
+import re
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django_perf import (
+    BUCKETS, RequestStats, ViewStats, fingerprint, registry, slow_queries
+)
+
+from tests.views import SLEEP_SECONDS
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    registry.reset()
+    slow_queries.reset()
+    yield
+    registry.reset()
+    slow_queries.reset()
+
+
+def test_server_timing_header(admin_client):
+    response = admin_client.get('/')
+    match = re.fullmatch(
+        r'sql;dur=[\d.]+;desc="(\d+) queries", tpl;dur=([\d.]+), '
+        r'total;dur=[\d.]+',
+        response.get('Server-Timing', '')
+    )
+    assert match, (
+        'Убедитесь, что в ответ добавляется заголовок `Server-Timing` со '
+        'временем SQL-запросов, рендеринга шаблонов и всего запроса.'
+    )
+    assert int(match.group(1)) > 0
+    assert float(match.group(2)) > 0
+
+
+def test_server_timing_for_staff_only(settings, client, django_user_model):
+    user = django_user_model.objects.create_user('user')
+    assert 'Server-Timing' not in client.get('/'), (
+        'Убедитесь, что по умолчанию заголовок `Server-Timing` не '
+        'отправляется анонимным пользователям.'
+    )
+    client.force_login(user)
+    assert 'Server-Timing' not in client.get('/')
+    settings.DEBUG = True
+    assert 'Server-Timing' in client.get('/'), (
+        'Убедитесь, что с DEBUG заголовок `Server-Timing` получают все.'
+    )
+
+
+@pytest.mark.parametrize('enabled', [True, False])
+def test_server_timing_setting(settings, client, admin_client, enabled):
+    settings.PERF_SERVER_TIMING = enabled
+    assert ('Server-Timing' in client.get('/')) is enabled
+    assert ('Server-Timing' in admin_client.get('/')) is enabled, (
+        'Убедитесь, что настройка `PERF_SERVER_TIMING` включает и '
+        'выключает заголовок `Server-Timing` для всех пользователей.'
+    )
+
+
+def test_view_histograms(client):
+    for _ in range(3):
+        client.get('/')
+    client.get('/no-such-page/')
+    views = {row['view']: row for row in registry.slowest(10)}
+    assert views['index']['count'] == 3, (
+        'Убедитесь, что статистика запросов собирается по представлениям.'
+    )
+    assert sum(views['index']['histogram'].values()) == 3
+    assert views['<unresolved>']['count'] == 1
+
+
+def test_percentile():
+    stats = ViewStats()
+    for duration in [0.001] * 90 + [0.3] * 10:
+        stats.add(RequestStats(), duration)
+    assert stats.percentile(0.5) == BUCKETS[0]
+    assert stats.percentile(0.95) == 300
+    assert stats.as_dict()['max_ms'] == 300
+
+
+def test_slowest_views_access(client, django_user_model, admin_client):
+    client.get('/')
+    assert client.get('/perf/slowest/').status_code == 403
+    client.force_login(django_user_model.objects.create_user('user'))
+    assert client.get('/perf/slowest/').status_code == 403
+    response = admin_client.get('/perf/slowest/?limit=1')
+    assert response.status_code == 200, (
+        'Убедитесь, что статистика самых медленных представлений доступна '
+        'администраторам.'
+    )
+    assert len(response.json()['views']) == 1
+
+
+def test_fingerprint():
+    assert fingerprint(
+        "SELECT *  FROM \"blog_post\"\n WHERE id IN (1, 2, %s) "
+        "AND title = 'It''s' AND rating > 4.5 LIMIT 21"
+    ) == (
+        'SELECT * FROM "blog_post" WHERE id IN (...) '
+        'AND title = ? AND rating > ? LIMIT ?'
+    ), 'Проверьте, что литералы и параметры удаляются из текста запроса.'
+    assert fingerprint(
+        'INSERT INTO t1 (a, b) VALUES (%s, %s), (%s, %s)'
+    ) == 'INSERT INTO t1 (a, b) VALUES (...)'
+
+
+def test_slow_query_log(settings, client, admin_client):
+    settings.SLOW_QUERY_MS = 0
+    client.get('/')
+    locations = {
+        location for row in slow_queries.worst(100)
+        if 'index' in row['views'] for location in row['locations']
+    }
+    assert any(location.startswith('views.py:') for location in locations), (
+        'Убедитесь, что запросы дольше `SLOW_QUERY_MS` попадают в журнал '
+        'с указанием представления и места в коде.'
+    )
+    assert 'template index.html' in locations
+    response = admin_client.get('/perf/slow-queries/?limit=2')
+    assert response.status_code == 200
+    assert len(response.json()['queries']) == 2
+
+
+def test_slow_queries_by_fingerprint():
+    for post_id in (1, 2):
+        slow_queries.record(
+            f'SELECT * FROM blog_post WHERE id = {post_id}', 0.2,
+            'blog:post_detail', 'blog/views/posts.py:1 in get_object'
+        )
+    (row,) = slow_queries.worst(10)
+    assert row['count'] == 2, (
+        'Убедитесь, что одинаковые запросы объединяются по отпечатку.'
+    )
+    assert row['total_ms'] == 400
+    assert row['views'] == {'blog:post_detail': 2}
+
+
+def test_slow_query_log_disabled(settings, client):
+    settings.SLOW_QUERY_MS = None
+    client.get('/')
+    assert not slow_queries.worst(100)
+
+
+def test_async_requests_run_concurrently(async_client):
+    async def get_all():
+        return await asyncio.gather(
+            *(async_client.get('/sleep/') for _ in range(4))
+        )
+
+    start = time.perf_counter()
+    responses = async_to_sync(get_all)()
+    elapsed = time.perf_counter() - start
+    assert all(response.status_code == 200 for response in responses)
+    assert elapsed < 3 * SLEEP_SECONDS, (
+        'Убедитесь, что `PerfMiddleware` не заставляет Django выполнять '
+        'асинхронные запросы по одному.'
+    )
+    assert registry.slowest(10)[0]['count'] == 4
+
+
+@pytest.mark.django_db(transaction=True)
+def test_queries_in_threads_counted(settings, client):
+    settings.SLOW_QUERY_MS = 0
+    client.get('/users/')
+    assert any(
+        'users_in_thread' in row['views'] and 'auth_user' in row['fingerprint']
+        for row in slow_queries.worst(100)
+    ), (
+        'Убедитесь, что учитываются запросы, выполненные в других потоках.'
+    )
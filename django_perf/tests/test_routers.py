@@ -0,0 +1,133 @@
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.http import HttpResponse
+from django_perf.routers import (
+    ReplicaMiddleware, ReplicaRouter, is_read_only_view
+)
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clean_pins():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.REPLICA_PIN_SECONDS = 60
+
+
+def make_view(used, view_attrs, reads=1, model=User):
+    def view(request):
+        used.extend(
+            ReplicaRouter().db_for_read(model) or 'default'
+            for _ in range(reads)
+        )
+        return HttpResponse()
+
+    for name, value in view_attrs.items():
+        setattr(view, name, value)
+    return view
+
+
+def _read_aliases(rf, method, view_attrs, token='client', **kwargs):
+    """Return the databases reads in the view are routed to."""
+    used = []
+    view = make_view(used, view_attrs, **kwargs)
+
+    def get_response(request):
+        middleware.process_view(request, view, (), {})
+        return view(request)
+
+    middleware = ReplicaMiddleware(get_response)
+    middleware(getattr(rf, method.lower())(
+        '/', HTTP_AUTHORIZATION=f'Bearer {token}'
+    ))
+    return used
+
+
+def _read_alias(rf, method, view_attrs, **kwargs):
+    return _read_aliases(rf, method, view_attrs, **kwargs)[0]
+
+
+@pytest.mark.parametrize('method, view_attrs, read_only', [
+    ('GET', {'actions': {'get': 'list'}}, True),
+    ('GET', {'actions': {'get': 'retrieve'}}, True),
+    ('POST', {'actions': {'post': 'create'}}, False),
+    ('GET', {'view_class': type('ListView', (), {'read_from_replica': True})},
+     True),
+    ('GET', {'cls': type('ListView', (), {'read_from_replica': True})}, True),
+    ('POST', {'view_class': type('ListView', (), {'read_from_replica': True})},
+     False),
+    ('GET', {}, False),
+])
+def test_read_only_views(rf, method, view_attrs, read_only):
+    view = make_view([], view_attrs)
+    request = getattr(rf, method.lower())('/')
+    assert is_read_only_view(request, view) is read_only, (
+        'Убедитесь, что с реплики читают только представления, которые не '
+        'изменяют данные.'
+    )
+
+
+def test_replica_routing(rf, replicas):
+    class ListView:
+        read_from_replica = True
+
+    read_view = {'view_class': ListView}
+    assert _read_alias(rf, 'GET', read_view) == 'replica'
+    assert _read_alias(rf, 'GET', {}) == 'default'
+    assert _read_alias(rf, 'GET', read_view, model=Session) == 'default', (
+        'Убедитесь, что сессии всегда читаются с основной базы данных.'
+    )
+    assert _read_alias(rf, 'GET', {'actions': {'get': 'list'}}) == 'replica'
+    assert _read_alias(rf, 'POST', {'actions': {'post': 'create'}}) == (
+        'default'
+    )
+    assert _read_alias(rf, 'GET', read_view) == 'default', (
+        'Убедитесь, что после изменения данных клиент читает с основной '
+        'базы данных.'
+    )
+    assert _read_alias(rf, 'GET', read_view, token='other') == 'replica'
+    assert ReplicaRouter().db_for_write(User) == 'default'
+
+
+def test_no_replicas(rf):
+    assert _read_alias(rf, 'GET', {'actions': {'get': 'list'}}) == 'default'
+
+
+def test_one_replica_per_request(rf, settings):
+    settings.DATABASE_REPLICAS = ['replica_1', 'replica_2']
+    view_attrs = {'actions': {'get': 'list'}}
+    last = mock.Mock(side_effect=lambda aliases: aliases[-1])
+    with mock.patch('random.choice', last):
+        used = _read_aliases(rf, 'GET', view_attrs, reads=5)
+    assert used == ['replica_2'] * 5, (
+        'Убедитесь, что все чтения запроса идут в одну реплику.'
+    )
+    last.assert_called_once()
+
+
+def test_async_replica_routing(rf, replicas):
+    used = []
+    view = make_view(used, {'actions': {'get': 'list'}})
+
+    async def get_response(request):
+        # Django runs sync process_view() and views in threads.
+        await sync_to_async(middleware.process_view)(request, view, (), {})
+        return await sync_to_async(view)(request)
+
+    middleware = ReplicaMiddleware(get_response)
+    async_to_sync(middleware)(rf.get('/'))
+    assert used == ['replica'], (
+        'Убедитесь, что `ReplicaMiddleware` работает и в асинхронном режиме.'
+    )
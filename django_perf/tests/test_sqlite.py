@@ -0,0 +1,54 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django_perf.sqlite import BenchmarkCommand
+
+pytestmark = [pytest.mark.django_db]
+
+User = get_user_model()
+
+
+class UserBenchmark(BenchmarkCommand):
+
+    def create_data(self, alias, n_posts):
+        User.objects.db_manager(alias).bulk_create(
+            User(username=f'user_{i}') for i in range(n_posts)
+        )
+
+    def read(self, alias):
+        list(User.objects.using(alias).order_by('username')[:10])
+
+    def write(self, alias, number):
+        User.objects.using(alias).filter(username='user_0').update(
+            first_name=str(number)
+        )
+
+
+def _pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+def test_sqlite_pragmas():
+    assert _pragma('busy_timeout') == 1234
+    assert _pragma('synchronous') == 1, (
+        'Убедитесь, что к новым соединениям с SQLite применяются настройки '
+        'из `SQLITE_PRAGMAS`.'
+    )
+
+
+def test_benchmark_command():
+    out = StringIO()
+    call_command(
+        UserBenchmark(), readers=2, writers=1, seconds=0.2, posts=20,
+        stdout=out
+    )
+    lines = out.getvalue().splitlines()
+    assert [line.split(':')[0].strip() for line in lines] == [
+        'default', 'tuned'
+    ]
+    assert all(' reads/s, ' in line for line in lines)
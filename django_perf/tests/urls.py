@@ -0,0 +1,12 @@
+from django.urls import path
+from django_perf import slow_queries_view, slowest_views
+
+from tests.views import index, sleep, users_in_thread
+
+urlpatterns = [
+    path('', index, name='index'),
+    path('sleep/', sleep, name='sleep'),
+    path('users/', users_in_thread, name='users_in_thread'),
+    path('perf/slowest/', slowest_views, name='slowest_views'),
+    path('perf/slow-queries/', slow_queries_view, name='slow_queries'),
+]
@@ -0,0 +1,29 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.shortcuts import render
+
+SLEEP_SECONDS = 0.3
+
+User = get_user_model()
+
+
+def index(request):
+    # The list of users is a lazy queryset evaluated by the template.
+    return render(request, 'index.html', {
+        'count': User.objects.count(),
+        'users': User.objects.order_by('username'),
+    })
+
+
+async def sleep(request):
+    await asyncio.sleep(SLEEP_SECONDS)
+    return HttpResponse()
+
+
+async def users_in_thread(request):
+    # Connections are per thread: this one was opened in the worker thread.
+    count = await sync_to_async(User.objects.count, thread_sensitive=False)()
+    return HttpResponse(count)
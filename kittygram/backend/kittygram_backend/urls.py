@@ -5,6 +5,7 @@ from django.urls import include, path
 
 from django.conf import settings
 from django.conf.urls.static import static
+from django_perf import slow_queries_view, slowest_views
 
 from cats.views import AchievementViewSet, CatViewSet
 
@@ -15,6 +16,8 @@ router.register(r'achievements', AchievementViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('perf/slowest/', slowest_views, name='slowest_views'),
+    path('perf/slow-queries/', slow_queries_view, name='slow_queries'),
     path('api/', include(router.urls)),
     path('api/', include('djoser.urls')),  # Работа с пользователями
     path('api/', include('djoser.urls.authtoken')),  # Работа с токенами